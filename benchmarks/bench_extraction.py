@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import synthetic_pdf
+from flashcard_core.extraction import _reader, extract_text
+
+
+def run(data: bytes, workers: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract_text(data, workers=workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF text extraction throughput")
+    parser.add_argument("--pdf", help="benchmark an existing PDF instead of a synthetic one")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pdf:
+        with open(args.pdf, "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_pdf(args.pages)
+
+    pages = len(_reader(data).pages)
+
+    for workers in sorted({1, args.workers}):
+        elapsed = run(data, workers, args.repeat)
+        print(f"workers={workers:<3} pages={pages:<5} {elapsed:8.3f}s  {pages / elapsed:8.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
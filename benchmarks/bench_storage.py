@@ -0,0 +1,69 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import synthetic_text
+from flashcard_core import compression, db
+from flashcard_core.chunking import split_text
+from flashcard_core.migrations import migrate
+from flashcard_core.repository import authenticate_user, get_document_content, insert_document, register_user
+
+
+def run(codec: str, texts, repeat: int):
+    directory = tempfile.mkdtemp(prefix="bench_storage_")
+    db.close_all()
+    db.DATABASE_FILE = os.path.join(directory, "bench.db")
+    compression.COMPRESSION_CODEC = codec
+    migrate()
+
+    register_user("bench", "bench", "bench@example.com")
+    user_id = authenticate_user("bench", "bench")
+    document_ids = [insert_document(user_id, f"Document {i}", "", split_text(text))
+                    for i, text in enumerate(texts)]
+
+    with db.connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(db.DATABASE_FILE)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document_id in document_ids:
+            get_document_content(document_id)
+        best = min(best, time.perf_counter() - start)
+
+    db.close_all()
+    shutil.rmtree(directory, ignore_errors=True)
+    return size, best / len(document_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Document text storage size and read latency")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--characters", type=int, default=60000, help="text length per document")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_text(args.characters, rng) for _ in range(args.documents)]
+    raw = sum(len(text.encode()) for text in texts)
+    print(f"documents={args.documents} raw text={raw / 1e6:.1f} MB")
+
+    codecs = ["none", "zlib"] + (["zstd"] if compression.zstandard else [])
+    baseline = None
+    for codec in codecs:
+        size, latency = run(codec, texts, args.repeat)
+        baseline = baseline or size
+        print(f"codec={codec:<5} db={size / 1e6:8.2f} MB ({size / baseline:6.1%})  "
+              f"read={latency * 1000:7.3f} ms/document")
+
+
+if __name__ == "__main__":
+    main()
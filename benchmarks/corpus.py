@@ -0,0 +1,39 @@
+import io
+import random
+
+WORDS = (
+    "cell membrane protein enzyme energy transport diffusion osmosis gradient receptor "
+    "nucleus ribosome synthesis replication transcription translation mutation allele "
+    "mitochondria chloroplast photosynthesis respiration glucose metabolism hormone neuron "
+    "the of and a to in is that for with as by on are this be from which an"
+).split()
+
+
+def synthetic_text(characters: int, rng: random.Random) -> str:
+    # Sentence-shaped filler with a small vocabulary, so it compresses and
+    # tokenises roughly like study notes rather than random bytes.
+    paragraphs, size = [], 0
+    while size < characters:
+        sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                     for _ in range(rng.randint(3, 8))]
+        paragraphs.append(" ".join(sentences))
+        size += len(paragraphs[-1]) + 2
+    return "\n\n".join(paragraphs)
+
+
+def synthetic_pdf(pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        y = 750
+        for line in range(lines_per_page):
+            words = " ".join(rng.choice(WORDS) for _ in range(10))
+            pdf.drawString(40, y, f"Page {page + 1} line {line + 1}: {words}.")
+            y -= 16
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ServiceUnavailable(Exception):
+    # Same class name as the SDK's retryable error, so the client retries it.
+    pass
+
+
+class FakeGeminiModel:
+    # A local stand-in for genai.GenerativeModel: responses are derived from a
+    # hash of the prompt (same prompt, same answer) and latency is simulated.
+    STREAM_PIECES = 20
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _respond(self, prompt: str) -> FakeResponse:
+        self.calls += 1
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise ServiceUnavailable("simulated overload")
+
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        if "multiple-choice" in prompt:
+            items = [{
+                "question_text": f"Question {i + 1} ({digest[:8]})?",
+                "correct_answer": f"Answer {digest[i:i + 6]}",
+                "option1": f"Distractor A{i}",
+                "option2": f"Distractor B{i}",
+                "option3": f"Distractor C{i}",
+            } for i in range(10)]
+        else:
+            match = re.search(r"Create (\d+) flashcards", prompt)
+            count = int(match.group(1)) if match else 10
+            items = [{
+                "front": f"Concept {digest[i:i + 8]}",
+                "back": f"Explanation of concept {digest[i:i + 8]}. " * 8,
+            } for i in range(count)]
+        return FakeResponse(f"```json\n{json.dumps(items, indent=2)}\n```")
+
+    def _pieces(self, response: FakeResponse):
+        # Streamed responses arrive in STREAM_PIECES roughly equal pieces.
+        size = -(-len(response.text) // self.STREAM_PIECES)
+        return [FakeResponse(response.text[i:i + size]) for i in range(0, len(response.text), size)]
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        if not stream:
+            time.sleep(self._delay())
+            return self._respond(prompt)
+
+        def pieces():
+            delay = self._delay()
+            response = self._respond(prompt)
+            chunks = self._pieces(response)
+            for chunk in chunks:
+                time.sleep(delay / len(chunks))
+                yield chunk
+        return pieces()
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        if not stream:
+            await asyncio.sleep(self._delay())
+            return self._respond(prompt)
+
+        async def pieces():
+            delay = self._delay()
+            response = self._respond(prompt)
+            chunks = self._pieces(response)
+            for chunk in chunks:
+                await asyncio.sleep(delay / len(chunks))
+                yield chunk
+        return pieces()
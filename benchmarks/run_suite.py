@@ -0,0 +1,299 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Everything the suite writes goes to a scratch directory; the paths are read
+# when flashcard_core is imported, so they are set first.
+WORKDIR = tempfile.mkdtemp(prefix="flashcard_bench_")
+os.environ.setdefault("FLASHCARD_DB_PATH", os.path.join(WORKDIR, "bench.db"))
+os.environ.setdefault("FLASHCARD_LLM_CACHE_PATH", os.path.join(WORKDIR, "llm_cache.db"))
+os.environ.setdefault("FLASHCARD_PDF_STORAGE_PATH", os.path.join(WORKDIR, "uploaded_pdfs"))
+os.environ.setdefault("FLASHCARD_PDF_EXPORT_PATH", os.path.join(WORKDIR, "exported_pdfs"))
+# Measure the pipeline rather than the production request quota; export
+# GEMINI_RPM to include rate limiting in the generation figures.
+os.environ.setdefault("GEMINI_RPM", "60000")
+os.environ.setdefault("GEMINI_BURST", "1000")
+
+from corpus import synthetic_pdf, synthetic_text  # noqa: E402
+from fake_gemini import FakeGeminiModel  # noqa: E402
+from seed import seed_database  # noqa: E402
+from flashcard_core import db, generation  # noqa: E402
+from flashcard_core.jobs import get_user_jobs  # noqa: E402
+from flashcard_core.llm_cache import get_cache  # noqa: E402
+from flashcard_core.migrations import migrate  # noqa: E402
+from flashcard_core.repository import (  # noqa: E402
+    authenticate_user, get_document_chunk_count, get_document_chunks, get_document_flashcards,
+    get_document_title, get_flashcards_page, get_question_accuracy, get_quiz_questions, get_user_documents,
+    get_user_progress, get_user_quizzes, insert_document, register_user,
+)
+from flashcard_core.scheduler import count_due_cards, get_due_cards  # noqa: E402
+from flashcard_core.search import search  # noqa: E402
+from flashcard_core.storage import ingest_pdf  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+STAGES = ("upload", "generation", "pages", "progress")
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def latency_summary(values: List[float]) -> Dict:
+    return {
+        "n": len(values),
+        "mean_ms": round(statistics.mean(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+    }
+
+
+def bench_user(name: str) -> str:
+    register_user(name, "benchmark", f"{name}@example.com")
+    return authenticate_user(name, "benchmark")
+
+
+def bench_upload(args) -> Dict:
+    user_id = bench_user("bench_upload")
+    pdfs = [synthetic_pdf(args.pages, seed=i) for i in range(args.documents)]
+
+    timings = []
+    start = time.perf_counter()
+    for i, data in enumerate(pdfs):
+        began = time.perf_counter()
+        ingest_pdf(data, f"Upload {i}", user_id)
+        timings.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "documents_per_second": round(len(pdfs) / elapsed, 3),
+        "pages_per_second": round(len(pdfs) * args.pages / elapsed, 1),
+        "megabytes_per_second": round(sum(map(len, pdfs)) / elapsed / 1e6, 3),
+        "latency": latency_summary(timings),
+    }
+
+
+def bench_generation(args) -> Dict:
+    model = FakeGeminiModel(latency=args.llm_latency, jitter=args.llm_latency / 2,
+                            failure_rate=args.llm_failure_rate, seed=args.seed)
+    generation.set_model(model)
+    get_cache().clear()
+
+    rng = random.Random(args.seed)
+    user_id = bench_user("bench_generation")
+    texts = [synthetic_text(args.characters, rng) for _ in range(args.documents)]
+
+    results, documents = {}, []
+    for label in ("cold", "cached"):
+        # Each pass generates for new documents with the same text: a document
+        # whose chunks are done is skipped, which would measure nothing.
+        documents = [insert_document(user_id, f"Generation {i} ({label})", "", [text])
+                     for i, text in enumerate(texts)]
+        timings, first_card = [], []
+        calls_before = model.calls
+        for document_id, text in zip(documents, texts):
+            began, first = time.perf_counter(), None
+            for cards, _ in generation.stream_flashcards(document_id, text):
+                if cards and first is None:
+                    first = time.perf_counter() - began
+            timings.append(time.perf_counter() - began)
+            first_card.append(timings[-1] if first is None else first)
+        results[f"flashcards_{label}"] = {**latency_summary(timings), "model_calls": model.calls - calls_before}
+        results[f"first_card_{label}"] = latency_summary(first_card)
+
+    timings = []
+    for document_id in documents:
+        began = time.perf_counter()
+        generation.generate_quiz(document_id, user_id)
+        timings.append(time.perf_counter() - began)
+    results["quiz"] = latency_summary(timings)
+    return results
+
+
+class QueryCounter:
+    # Top-level statements are the round trips the page makes; SQLite reports
+    # statements run inside triggers and virtual tables (FTS5 shadow tables)
+    # with a "-- " prefix, and those are counted separately.
+    def __init__(self):
+        self.statements = 0
+        self.nested = 0
+
+    def __call__(self, statement: str):
+        if statement.startswith("-- "):
+            self.nested += 1
+        elif not statement.startswith(("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA")):
+            self.statements += 1
+
+
+def page_loaders(user: Dict) -> Dict[str, Callable[[], object]]:
+    # The data each Streamlit page loads on one rerun (see updated.py).
+    user_id, document_id, quiz_id = user["user_id"], user["documents"][0], user["quizzes"][0]
+    return {
+        "dashboard": lambda: (get_user_progress(user_id), get_user_jobs(user_id), get_user_documents(user_id)),
+        "flashcards": lambda: get_flashcards_page(user_id, 5, None, 10),
+        "document": lambda: (get_document_title(document_id), get_document_flashcards(document_id),
+                             get_document_chunk_count(document_id), get_document_chunks(document_id, 0, 1)),
+        "quizzes": lambda: get_user_quizzes(user_id),
+        "take_quiz": lambda: (get_quiz_questions(quiz_id), get_question_accuracy(quiz_id)),
+        "progress": lambda: get_user_progress(user_id, with_history=True),
+        "review": lambda: (get_due_cards(user_id, 20), count_due_cards(user_id)),
+        "search": lambda: search(user_id, "mitochondria", 30),
+    }
+
+
+def seeded_users(args) -> List[Dict]:
+    return seed_database(args.users, args.seed_documents, args.seed_flashcards,
+                         args.seed_quizzes, args.seed_attempts, seed=args.seed)
+
+
+def bench_pages(args, users: List[Dict]) -> Dict:
+    results = {}
+    for page, load in page_loaders(users[-1]).items():
+        counter = QueryCounter()
+        timings = []
+        with db.connection() as conn:
+            conn.set_trace_callback(counter)
+            load()
+            conn.set_trace_callback(None)
+            for _ in range(args.repeat):
+                began = time.perf_counter()
+                load()
+                timings.append(time.perf_counter() - began)
+        results[page] = {"queries": counter.statements, "nested_statements": counter.nested,
+                         **latency_summary(timings)}
+    return results
+
+
+def bench_progress(args, users: List[Dict]) -> Dict:
+    user_id = users[-1]["user_id"]
+    results = {}
+    for label, with_history in (("stats", False), ("report", True)):
+        timings = []
+        for _ in range(args.repeat):
+            began = time.perf_counter()
+            get_user_progress(user_id, with_history=with_history)
+            timings.append(time.perf_counter() - began)
+        results[label] = latency_summary(timings)
+    results["attempts"] = args.seed_attempts
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(current: Dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    before, after = flatten(baseline["results"]), flatten(current["results"])
+    for name in sorted(after):
+        if name in before and before[name]:
+            change = (after[name] - before[name]) / before[name] * 100
+            print(f"  {name:<50} {before[name]:>12g} -> {after[name]:>12g}  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite with a local stand-in for Gemini")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {', '.join(STAGES)}")
+    parser.add_argument("--documents", type=int, default=10, help="documents for the upload and generation stages")
+    parser.add_argument("--pages", type=int, default=20, help="pages per synthetic PDF")
+    parser.add_argument("--characters", type=int, default=30000, help="text length per generation document")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="simulated seconds per model call")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed-documents", type=int, default=50, help="documents per seeded user")
+    parser.add_argument("--seed-flashcards", type=int, default=40, help="flashcards per seeded document")
+    parser.add_argument("--seed-quizzes", type=int, default=10, help="quizzes per seeded user")
+    parser.add_argument("--seed-attempts", type=int, default=2000, help="quiz attempts per seeded user")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", help="earlier results file to print changes against")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--keep-workdir", action="store_true", help="keep the scratch database and files")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    migrate()
+    results: Dict[str, Dict] = {}
+    if "upload" in stages:
+        print("upload...", flush=True)
+        results["upload"] = bench_upload(args)
+    if "generation" in stages:
+        print("generation...", flush=True)
+        results["generation"] = bench_generation(args)
+    if "pages" in stages or "progress" in stages:
+        print("seeding...", flush=True)
+        started = time.perf_counter()
+        users = seeded_users(args)
+        results["seed"] = {"seconds": round(time.perf_counter() - started, 2),
+                           "database_megabytes": round(os.path.getsize(db.DATABASE_FILE) / 1e6, 2)}
+        if "pages" in stages:
+            print("pages...", flush=True)
+            results["pages"] = bench_pages(args, users)
+        if "progress" in stages:
+            print("progress...", flush=True)
+            results["progress"] = bench_progress(args, users)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("compare", "no_save", "keep_workdir")},
+        "results": results,
+    }
+    print(json.dumps(results, indent=2))
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{report['timestamp'].replace(':', '')}-{report['commit']}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    if "generation" in stages:
+        generation.get_client(generation.get_model()).close()
+    db.close_all()
+    if args.keep_workdir:
+        print(f"Scratch files kept in {WORKDIR}")
+    else:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import random
+from typing import Dict, List
+
+from corpus import synthetic_text
+from flashcard_core import db
+from flashcard_core.repository import (
+    authenticate_user, generate_id, insert_document, insert_flashcards, insert_questions, insert_quiz,
+    insert_quiz_attempt, register_user,
+)
+
+
+def seed_database(users: int, documents_per_user: int, flashcards_per_document: int,
+                  quizzes_per_user: int, attempts_per_user: int, pages_per_document: int = 10,
+                  seed: int = 0) -> List[Dict]:
+    # Seeds through the repository functions, so triggers, search indexes,
+    # compression and progress rollups are populated exactly as in production.
+    # One transaction per user keeps seeding fast.
+    rng = random.Random(seed)
+    seeded = []
+    for u in range(users):
+        username = f"bench_user_{u}"
+        register_user(username, "benchmark", f"{username}@example.com")
+        user_id = authenticate_user(username, "benchmark")
+
+        with db.transaction():
+            documents = []
+            for d in range(documents_per_user):
+                pages = [synthetic_text(2500, rng) for _ in range(pages_per_document)]
+                document_id = insert_document(user_id, f"Document {u}-{d}", "", pages)
+                insert_flashcards(document_id, [
+                    {"front": f"Concept {d}-{c}: {synthetic_text(40, rng)[:60]}", "back": synthetic_text(400, rng)}
+                    for c in range(flashcards_per_document)
+                ])
+                documents.append(document_id)
+
+            quizzes = []
+            for q in range(quizzes_per_user if documents else 0):
+                quiz_id = generate_id()
+                insert_quiz(quiz_id, documents[q % len(documents)], user_id, f"Quiz {u}-{q}")
+                insert_questions(quiz_id, [{
+                    "question_text": f"Question {i}: {synthetic_text(60, rng)[:80]}?",
+                    "correct_answer": "Right",
+                    "option1": "Wrong 1",
+                    "option2": "Wrong 2",
+                    "option3": "Wrong 3",
+                } for i in range(10)])
+                quizzes.append(quiz_id)
+
+            for _ in range(attempts_per_user if quizzes else 0):
+                insert_quiz_attempt(generate_id(), rng.choice(quizzes), user_id, rng.randint(0, 10), 10)
+
+        seeded.append({"user_id": user_id, "documents": documents, "quizzes": quizzes})
+    return seeded
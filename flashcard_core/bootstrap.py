@@ -0,0 +1,85 @@
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict
+
+from flashcard_core import db, metrics
+from flashcard_core.migrations import MIGRATIONS, current_version, migrate
+
+
+_lock = threading.Lock()
+_status: Dict = {
+    "ok": False,
+    "database": None,
+    "schema_version": None,
+    "error": None,
+    "completed_at": None,
+}
+
+
+def bootstrap() -> Dict:
+    with _lock:
+        if _status["ok"]:
+            return dict(_status)
+
+        _status["database"] = db.DATABASE_FILE
+        try:
+            _status["schema_version"] = migrate()
+        except Exception as e:
+            _status["error"] = str(e)
+            raise
+
+        _status["ok"] = True
+        _status["error"] = None
+        _status["completed_at"] = time.time()
+        return dict(_status)
+
+
+def health() -> Dict:
+    with _lock:
+        status = dict(_status)
+
+    if status["ok"]:
+        try:
+            db.fetch_one("SELECT 1")
+        except Exception as e:
+            status["ok"] = False
+            status["error"] = str(e)
+    return status
+
+
+# A running process reports its own state at /healthz on its metrics port.
+metrics.set_health_check(health)
+
+
+def check_database() -> Dict:
+    # For probes outside the app process: opens the configured database read-only
+    # and compares its schema version with this code's, without migrating.
+    status = {
+        "ok": False,
+        "database": db.DATABASE_FILE,
+        "schema_version": None,
+        "expected_version": MIGRATIONS[-1][0],
+        "error": None,
+    }
+    try:
+        conn = sqlite3.connect(f"file:{db.DATABASE_FILE}?mode=ro", uri=True, timeout=db.BUSY_TIMEOUT)
+        try:
+            status["schema_version"] = current_version(conn)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        status["error"] = str(e)
+        return status
+
+    status["ok"] = status["schema_version"] == status["expected_version"]
+    if not status["ok"]:
+        status["error"] = f"schema version {status['schema_version']}, expected {status['expected_version']}"
+    return status
+
+
+if __name__ == "__main__":
+    status = check_database()
+    print(status)
+    sys.exit(0 if status["ok"] else 1)
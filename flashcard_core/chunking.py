@@ -0,0 +1,85 @@
+import os
+import re
+from typing import Dict, List, Optional, Set
+
+
+CHUNK_SIZE = int(os.getenv("FLASHCARD_CHUNK_SIZE", "7000"))
+CHUNK_OVERLAP = int(os.getenv("FLASHCARD_CHUNK_OVERLAP", "500"))
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_HEADING = re.compile(r"^\s*(?:(?:chapter|section|part|unit)\b|\d+(?:\.\d+)*\.?\s+\S|[A-Z][A-Z0-9 ,:&'-]{3,80}$)", re.IGNORECASE)
+
+
+def _split_oversized(block: str, chunk_size: int) -> List[str]:
+    # Prefer line breaks, then sentence ends, and only cut mid-sentence as a last resort.
+    for pattern in ("\n", _SENTENCE_END):
+        parts = block.split(pattern) if isinstance(pattern, str) else pattern.split(block)
+        if len(parts) > 1 and max(len(p) for p in parts) < len(block):
+            pieces: List[str] = []
+            for part in parts:
+                pieces.extend(_split_oversized(part, chunk_size) if len(part) > chunk_size else [part])
+            return pieces
+    return [block[i:i + chunk_size] for i in range(0, len(block), chunk_size)]
+
+
+def _blocks(text: str, chunk_size: int) -> List[str]:
+    blocks: List[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) > chunk_size:
+            blocks.extend(p.strip() for p in _split_oversized(paragraph, chunk_size) if p.strip())
+        else:
+            blocks.append(paragraph)
+    return blocks
+
+
+def split_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+
+    for block in _blocks(text, chunk_size):
+        # Start a new chunk at a heading once the current one is reasonably full,
+        # so sections are not split across calls more than necessary.
+        starts_section = bool(_HEADING.match(block.split("\n", 1)[0])) and length > chunk_size // 2
+        if current and (length + len(block) + 1 > chunk_size or starts_section):
+            chunks.append("\n\n".join(current))
+
+            # Carry trailing blocks forward as context for the next chunk.
+            carried: List[str] = []
+            carried_length = 0
+            for previous in reversed(current):
+                if carried_length + len(previous) > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_length += len(previous) + 2
+            while carried and carried_length + len(block) > chunk_size:
+                carried_length -= len(carried.pop(0)) + 2
+            current, length = carried, carried_length
+
+        current.append(block)
+        length += len(block) + 2
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def dedupe_cards(cards: List[Dict], key: str = "front", seen: Optional[Set[str]] = None) -> List[Dict]:
+    # Pass the same `seen` set to dedupe cards that arrive in several batches.
+    seen = set() if seen is None else seen
+    unique = []
+    for card in cards:
+        normalized = _normalize(str(card.get(key, "")))
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        unique.append(card)
+    return unique
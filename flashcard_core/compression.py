@@ -0,0 +1,44 @@
+import os
+import zlib
+from typing import Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSION_CODEC = os.getenv("FLASHCARD_COMPRESSION", "zstd" if zstandard else "zlib")
+COMPRESSION_MIN_BYTES = int(os.getenv("FLASHCARD_COMPRESSION_MIN_BYTES", "256"))
+
+# Compressed values are BLOBs tagged with a one-byte codec marker; anything stored
+# as TEXT (short values, rows written before compression) is returned unchanged.
+_ZLIB = b"z"
+_ZSTD = b"s"
+
+
+def compress_text(text: str, codec: Optional[str] = None) -> Union[str, bytes]:
+    codec = codec or COMPRESSION_CODEC
+    raw = text.encode()
+    if codec == "none" or len(raw) < COMPRESSION_MIN_BYTES:
+        return text
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("FLASHCARD_COMPRESSION=zstd requires the 'zstandard' package")
+        return _ZSTD + zstandard.ZstdCompressor(level=6).compress(raw)
+    if codec == "zlib":
+        return _ZLIB + zlib.compress(raw, 6)
+    raise ValueError(f"Unknown compression codec '{codec}'")
+
+
+def decompress_text(value: Union[str, bytes, None]) -> Union[str, None]:
+    if value is None or isinstance(value, str):
+        return value
+    marker, payload = value[:1], value[1:]
+    if marker == _ZLIB:
+        return zlib.decompress(payload).decode()
+    if marker == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Reading zstd-compressed text requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(payload).decode()
+    raise ValueError(f"Unknown compression marker {marker!r}")
@@ -0,0 +1,140 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from flashcard_core.compression import decompress_text
+
+
+DATABASE_FILE = os.getenv("FLASHCARD_DB_PATH", "flashcard_app.db")
+BUSY_TIMEOUT = float(os.getenv("FLASHCARD_DB_BUSY_TIMEOUT", "5.0"))
+POOL_SIZE = int(os.getenv("FLASHCARD_DB_POOL_SIZE", "8"))
+CACHED_STATEMENTS = int(os.getenv("FLASHCARD_DB_CACHED_STATEMENTS", "256"))
+
+
+class ConnectionPool:
+    # Connections are checked out for the duration of a `connection()` block and
+    # pinned to the calling thread, so nested helpers in the same thread share one
+    # connection (and its transaction) instead of opening another.
+    def __init__(self, database: str, max_size: int = POOL_SIZE,
+                 busy_timeout: float = BUSY_TIMEOUT, cached_statements: int = CACHED_STATEMENTS):
+        self.database = database
+        self.max_size = max_size
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=max_size)
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        # Used by the search triggers to index compressed document text.
+        conn.create_function("decompress_text", 1, decompress_text, deterministic=True)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+
+            # Take the write lock up front so concurrent writers queue on
+            # busy_timeout instead of failing on a read->write upgrade.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database: Optional[str] = None) -> ConnectionPool:
+    database = database or DATABASE_FILE
+    pool = _pools.get(database)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(database, ConnectionPool(database))
+    return pool
+
+
+def connection(database: Optional[str] = None):
+    return get_pool(database).connection()
+
+
+def transaction(database: Optional[str] = None):
+    return get_pool(database).transaction()
+
+
+def fetch_one(sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def fetch_all(sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def execute(sql: str, params: Sequence[Any] = ()) -> int:
+    with transaction() as conn:
+        return conn.execute(sql, params).rowcount
+
+
+def executemany(sql: str, rows: Iterable[Sequence[Any]]) -> int:
+    with transaction() as conn:
+        return conn.executemany(sql, rows).rowcount
+
+
+def close_all():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,90 @@
+import glob
+import io
+import os
+from typing import Dict, List
+
+from flashcard_core import metrics
+from flashcard_core.repository import generate_id, get_document_flashcards, get_document_title, get_flashcard_version
+
+
+PDF_EXPORT_PATH = os.getenv("FLASHCARD_PDF_EXPORT_PATH", "exported_pdfs")
+
+
+@metrics.timed("render_pdf")
+def generate_flashcards_pdf(flashcards: List[Dict], document_title: str) -> bytes:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter,
+                            leftMargin=50, rightMargin=50, topMargin=50, bottomMargin=30)
+    styles = getSampleStyleSheet()
+
+    title_style = ParagraphStyle('TitleStyle', parent=styles['Title'], fontSize=20, textColor=colors.darkblue, alignment=1, spaceAfter=15)
+    flashcard_title_style = ParagraphStyle('FlashcardTitleStyle', parent=styles['Heading2'], fontSize=16, spaceAfter=10, textColor=colors.white, backColor=colors.darkred, alignment=1, leading=20)
+    flashcard_front_style = ParagraphStyle('FrontStyle', parent=styles['Normal'], fontSize=14, leading=18, spaceAfter=5, textColor=colors.black, alignment=4)  # **Justified**
+    flashcard_back_style = ParagraphStyle('BackStyle', parent=styles['Normal'], fontSize=12, leading=16, textColor=colors.darkblue, spaceAfter=10, alignment=4)  # **Justified**
+
+    elements = []
+
+    elements.append(Paragraph(f"{document_title}", title_style))
+    elements.append(Spacer(1, 0.3 * inch))
+
+    table_data = []
+    for i, card in enumerate(flashcards):
+        flashcard_title = Paragraph(f"<b>Flashcard {i+1}</b>", flashcard_title_style)
+        front_side = Paragraph(f"<b>{card['front']}</b>", flashcard_front_style)
+        back_side = Paragraph(f"{card['back']}", flashcard_back_style)
+
+        table_data.append([flashcard_title])
+        table_data.append([front_side])
+        table_data.append([back_side])
+        table_data.append([Spacer(1, 0.3 * inch)])  # Space between flashcards
+
+    # **Apply Table Styling**
+    table = Table(table_data, colWidths=[6.5 * inch])  # Adjust width to center text
+    table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),  # Center everything
+        ('LEFTPADDING', (0, 0), (-1, -1), 10),  # Ensure proper padding
+        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 5),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),  # Title background
+    ]))
+
+    elements.append(table)
+
+    doc.build(elements)
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+
+    return pdf_bytes
+
+
+def get_flashcards_pdf(document_id: str) -> bytes:
+    # Exports are cached per flashcard-set version; a new version leaves the old file stale.
+    version = get_flashcard_version(document_id)
+    filepath = os.path.join(PDF_EXPORT_PATH, f"{document_id}_v{version}.pdf")
+    if os.path.exists(filepath):
+        metrics.count("pdf_exports", result="cached")
+        with open(filepath, "rb") as f:
+            return f.read()
+
+    metrics.count("pdf_exports", result="rendered")
+
+    pdf_bytes = generate_flashcards_pdf(get_document_flashcards(document_id), get_document_title(document_id))
+
+    os.makedirs(PDF_EXPORT_PATH, exist_ok=True)
+    tmp_path = f"{filepath}.{generate_id()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, filepath)
+
+    for stale in glob.glob(os.path.join(PDF_EXPORT_PATH, f"{document_id}_v*.pdf")):
+        if stale != filepath:
+            os.remove(stale)
+
+    return pdf_bytes
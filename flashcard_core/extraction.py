@@ -0,0 +1,109 @@
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from flashcard_core import metrics
+
+
+EXTRACT_WORKERS = int(os.getenv("FLASHCARD_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_MIN_PAGES = int(os.getenv("FLASHCARD_EXTRACT_PARALLEL_MIN_PAGES", "32"))
+MIN_PAGES_PER_TASK = int(os.getenv("FLASHCARD_EXTRACT_MIN_PAGES_PER_TASK", "8"))
+TASKS_PER_WORKER = int(os.getenv("FLASHCARD_EXTRACT_TASKS_PER_WORKER", "4"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _reader(data: bytes):
+    import PyPDF2
+    return PyPDF2.PdfReader(io.BytesIO(data))
+
+
+def _extract_range(data: bytes, start: int, stop: int) -> Tuple[int, List[str]]:
+    # Runs in a worker process: each task receives and parses the document once
+    # and extracts a contiguous run of pages.
+    reader = _reader(data)
+    return start, [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _new_executor(workers: int) -> ProcessPoolExecutor:
+    # Spawned rather than forked: the app process runs several threads (job
+    # workers, the model client, metrics), and forking those can deadlock.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _new_executor(EXTRACT_WORKERS)
+        return _executor
+
+
+def _split(total: int, workers: int) -> List[Tuple[int, int]]:
+    # A few contiguous ranges per worker: each range costs sending and parsing
+    # the PDF once, but smaller ranges let an abandoned extraction stop sooner.
+    tasks = max(1, min(workers * TASKS_PER_WORKER, total // MIN_PAGES_PER_TASK))
+    size = -(-total // tasks)
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def iter_pages(data: bytes, workers: Optional[int] = None) -> Iterator[Tuple[int, int, List[str]]]:
+    # Yields (pages_done, total_pages, pages) after every completed unit of work.
+    # `pages` is the full per-page list, filled in as results arrive.
+    reader = _reader(data)
+    total = len(reader.pages)
+    pages: List[str] = [""] * total
+    workers = EXTRACT_WORKERS if workers is None else workers
+
+    if workers <= 1 or total < PARALLEL_MIN_PAGES:
+        for i in range(total):
+            pages[i] = reader.pages[i].extract_text() or ""
+            yield i + 1, total, pages
+        return
+
+    executor = _get_executor() if workers == EXTRACT_WORKERS else _new_executor(workers)
+    # Ranges are submitted as earlier ones finish, at most `workers` at a time,
+    # so an abandoned extraction (e.g. a cancelled upload) leaves only the
+    # ranges already running on the shared pool.
+    ranges = iter(_split(total, workers))
+    running = set()
+    try:
+        running = {executor.submit(_extract_range, data, start, stop)
+                   for start, stop in itertools.islice(ranges, workers)}
+        done = 0
+        while running:
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                start, texts = future.result()
+                pages[start:start + len(texts)] = texts
+                done += len(texts)
+                task = next(ranges, None)
+                if task:
+                    running.add(executor.submit(_extract_range, data, *task))
+                yield done, total, pages
+    finally:
+        for future in running:
+            future.cancel()
+        if executor is not _executor:
+            executor.shutdown()
+
+
+def extract_pages(data: bytes, progress: Optional[Callable[[int, int], None]] = None,
+                  workers: Optional[int] = None) -> List[str]:
+    pages: List[str] = []
+    with metrics.timer("extract"):
+        for done, total, pages in iter_pages(data, workers):
+            if progress:
+                progress(done, total)
+    metrics.count("pages_extracted", len(pages))
+    return pages
+
+
+def extract_text(data: bytes, progress: Optional[Callable[[int, int], None]] = None,
+                 workers: Optional[int] = None) -> str:
+    return "".join(extract_pages(data, progress, workers))
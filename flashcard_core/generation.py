@@ -0,0 +1,283 @@
+import os
+import threading
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from flashcard_core import db, metrics
+from flashcard_core.chunking import dedupe_cards, split_text
+from flashcard_core.json_stream import FLASHCARD_FIELDS, QUESTION_FIELDS, JsonObjectStream, parse_objects
+from flashcard_core.llm_cache import get_cache
+from flashcard_core.llm_client import get_client
+from flashcard_core.repository import (
+    find_duplicate_questions, generate_id, get_document_content, get_document_flashcards, get_document_title,
+    get_generated_chunks, insert_flashcards, insert_questions, insert_quiz, mark_chunk_generated,
+    set_flashcards_complete,
+)
+
+
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "models/gemini-1.5-flash")
+FLASHCARDS_PER_CHUNK = int(os.getenv("FLASHCARDS_PER_CHUNK", "10"))
+QUIZ_SOURCE_CARDS = int(os.getenv("QUIZ_SOURCE_CARDS", "40"))
+
+# Bump when a prompt template changes so cached responses for the old wording are not reused
+FLASHCARD_PROMPT_VERSION = "2"
+QUIZ_PROMPT_VERSION = "1"
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    # The SDK is imported and configured on first use, not when this module loads.
+    global _model
+    with _model_lock:
+        if _model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        return _model
+
+
+def set_model(model):
+    # Swap in another model object (e.g. a local stand-in for benchmarks).
+    global _model
+    with _model_lock:
+        _model = model
+
+
+def _cached(cache, template_version: str, prompt: str, parse: Callable[[str], Any]) -> Any:
+    # The parsed cached response, or None. An entry that no longer parses is
+    # dropped so the prompt goes back to the model.
+    response = cache.get(GEMINI_MODEL_NAME, template_version, prompt)
+    if response is None:
+        return None
+    try:
+        return parse(response)
+    except ValueError:
+        cache.delete(GEMINI_MODEL_NAME, template_version, prompt)
+        return None
+
+
+def generate_texts(prompts: List[str], template_version: str, parse: Callable[[str], Any]) -> List[Any]:
+    # Returns the parsed response or the raised exception for each prompt, in order.
+    # Cache misses are sent together so the client can run them concurrently.
+    # Responses are cached only once they parse, so a refusal or a truncated
+    # reply is retried next time instead of being replayed for the cache TTL.
+    cache = get_cache()
+    results: List[Any] = [_cached(cache, template_version, prompt, parse) for prompt in prompts]
+    misses = [i for i, result in enumerate(results) if result is None]
+    metrics.count("llm_prompts", len(prompts) - len(misses), source="cache")
+    if not misses:
+        return results
+
+    metrics.count("llm_prompts", len(misses), source="model")
+    with metrics.timer("llm_batch"):
+        responses = get_client(get_model()).generate_many([prompts[i] for i in misses])
+    for i, response in zip(misses, responses):
+        results[i] = response
+        if isinstance(response, str):
+            try:
+                results[i] = parse(response)
+            except ValueError as e:
+                results[i] = e
+                continue
+            cache.put(GEMINI_MODEL_NAME, template_version, prompts[i], response)
+
+    return results
+
+
+def generate_text(prompt: str, template_version: str, parse: Callable[[str], Any]) -> Any:
+    result = generate_texts([prompt], template_version, parse)[0]
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def parse_response(response_text: str, fields: Tuple[str, ...], kind: str) -> List[Dict]:
+    # Keeps every well-formed object even when the rest of the response is
+    # truncated or malformed; fails only if nothing usable came back.
+    with metrics.timer("parse_json", kind=kind):
+        items, rejected = parse_objects(response_text, fields)
+    if rejected:
+        metrics.count("json_rejected", rejected, kind=kind)
+    if not items:
+        raise ValueError(f"No valid {kind} found in the model response.")
+    return items
+
+
+def flashcard_prompt(chunk: str, count: int) -> str:
+    return f"""
+    Create {count} flashcards from the following text. Each flashcard should be comprehensive and include at least 33% of the original content's key points.
+
+    For each flashcard:
+    1. The 'front' should be a key concept, term, or question
+    2. The 'back' must be detailed and thorough, covering at least 33% of the relevant information from the source text
+    3. Include examples, context, and explanations where appropriate
+    4. Make sure the explanations are substantive and not oversimplified
+
+    Format the result as a JSON array of objects, each with 'front' and 'back' properties.
+    
+    Text:
+    {chunk}
+    
+    Response format:
+    [
+        {{"front": "Concept/Question", "back": "Detailed explanation that covers at least 33% of the relevant information from the source text"}},
+        ...
+    ]
+    """
+
+
+def parse_flashcards(response_text: str) -> List[Dict]:
+    return parse_response(response_text, FLASHCARD_FIELDS, "flashcards")
+
+
+def stream_flashcards(document_id: str, text_content: str) -> Iterator[Tuple[List[Dict], float]]:
+    # Map: one generation per chunk of the document, streamed concurrently by the
+    # client. Cards are stored and yielded as soon as they are complete, with the
+    # fraction of chunks finished; closing the generator cancels the requests
+    # still running and keeps the cards stored so far. Chunks finished by an
+    # earlier, interrupted run are skipped, so calling this again resumes.
+    start = time.perf_counter()
+    prompts = [flashcard_prompt(chunk, FLASHCARDS_PER_CHUNK) for chunk in split_text(text_content)]
+    generated = get_generated_chunks(document_id)
+    pending = [i for i in range(len(prompts)) if i not in generated]
+    seen: Set[str] = set()
+    stored, errors = 0, []
+    finished = len(prompts) - len(pending)
+    # Cards stored by an interrupted run, including one stopped partway
+    # through a chunk that was never marked done
+    dedupe_cards(get_document_flashcards(document_id), seen=seen)
+
+    def store(cards: List[Dict]) -> List[Dict]:
+        # Reduce: drop cards repeated across overlapping chunks
+        nonlocal stored
+        cards = dedupe_cards(cards, seen=seen)
+        if cards:
+            if not stored:
+                metrics.observe("first_flashcard", time.perf_counter() - start)
+            insert_flashcards(document_id, cards)
+            metrics.count("flashcards_generated", len(cards))
+            stored += len(cards)
+        return cards
+
+    def chunk_done(index: int):
+        nonlocal finished
+        finished += 1
+        mark_chunk_generated(document_id, index)
+
+    cache = get_cache()
+    cached = {i: _cached(cache, FLASHCARD_PROMPT_VERSION, prompts[i], parse_flashcards) for i in pending}
+    misses = [i for i in pending if cached[i] is None]
+    metrics.count("llm_prompts", len(pending) - len(misses), source="cache")
+
+    for index in pending:
+        if cached[index] is None:
+            continue
+        cards = store(cached[index])
+        chunk_done(index)
+        yield cards, finished / len(prompts)
+
+    if misses:
+        metrics.count("llm_prompts", len(misses), source="model")
+        parsers = {i: JsonObjectStream(FLASHCARD_FIELDS) for i in misses}
+        parsed = dict.fromkeys(misses, 0)
+        events = get_client(get_model()).stream_many([prompts[i] for i in misses])
+        with metrics.timer("llm_batch"), closing(events):
+            for position, text, result in events:
+                index = misses[position]
+                parser = parsers[index]
+                if result is None:
+                    cards = parser.feed(text)
+                else:
+                    cards = parser.close()
+                    if parser.rejected:
+                        metrics.count("json_rejected", parser.rejected, kind="flashcards")
+                    if isinstance(result, BaseException):
+                        errors.append(result)
+                    elif parsed[index] or cards:
+                        cache.put(GEMINI_MODEL_NAME, FLASHCARD_PROMPT_VERSION, prompts[index], result)
+                    else:
+                        errors.append(ValueError("No valid flashcards found in the model response."))
+                parsed[index] += len(cards)
+
+                cards = store(cards)
+                if result is not None and not isinstance(result, BaseException) and parsed[index]:
+                    chunk_done(index)
+                if cards or result is not None:
+                    yield cards, finished / len(prompts)
+
+    if finished == len(prompts):
+        set_flashcards_complete(document_id)
+    elif not stored and errors:
+        raise errors[0]
+
+
+@metrics.timed("generate_flashcards")
+def generate_flashcards(document_id: str, text_content: str) -> List[Dict]:
+    return [card for cards, _ in stream_flashcards(document_id, text_content) for card in cards]
+
+
+def generate_quiz_questions(flashcards: List[Dict]) -> List[Dict]:
+    # Long documents produce many cards; an evenly spaced sample keeps the prompt bounded
+    step = max(1, -(-len(flashcards) // QUIZ_SOURCE_CARDS))
+    flashcards = flashcards[::step]
+
+    # Prepare the prompt for Gemini to create MCQs from flashcards
+    flashcard_text = "\n".join([f"Topic: {card['front']}\nExplanation: {card['back']}" for card in flashcards])
+
+    prompt = f"""
+    Create 10 multiple-choice questions based on these flashcard topics:
+    
+    {flashcard_text}
+    
+    Format the result as a JSON array of objects, each with 'question_text', 'correct_answer', 'option1', 'option2', and 'option3' properties.
+    The 'correct_answer' should be the right answer, and options should be plausible but incorrect alternatives.
+    
+    Response format:
+    [
+        {{
+            "question_text": "Question goes here?",
+            "correct_answer": "Correct answer",
+            "option1": "Wrong option 1",
+            "option2": "Wrong option 2",
+            "option3": "Wrong option 3"
+        }},
+        ...
+    ]
+    """
+
+    # Generate questions using Gemini API
+    return generate_text(prompt, QUIZ_PROMPT_VERSION,
+                         lambda response_text: parse_response(response_text, QUESTION_FIELDS, "questions"))
+
+
+@metrics.timed("generate_quiz")
+def generate_quiz(document_id: str, user_id: str, document_content: Optional[str] = None) -> str:
+    # A first quiz on a duplicate upload reuses the questions generated for it
+    questions = find_duplicate_questions(document_id)
+
+    if not questions:
+        # Quizzes are built from the document's flashcards, generated here if needed;
+        # only then is the document text loaded (when the caller doesn't have it)
+        flashcards = get_document_flashcards(document_id)
+        if not flashcards:
+            if document_content is None:
+                document_content = get_document_content(document_id)
+            flashcards = generate_flashcards(document_id, document_content)
+        if not flashcards:
+            raise RuntimeError("No flashcards could be generated for this document.")
+
+        questions = generate_quiz_questions(flashcards)
+
+    quiz_id = generate_id()
+    quiz_title = f"Quiz on {get_document_title(document_id)}"
+
+    # Store quiz and questions in one short transaction, opened only now that
+    # generation is done so the write lock is never held across a model call
+    with db.transaction():
+        insert_quiz(quiz_id, document_id, user_id, quiz_title)
+        insert_questions(quiz_id, questions)
+
+    return quiz_id
@@ -0,0 +1,47 @@
+# Importing this module registers the job handlers; workers import it before polling.
+from contextlib import closing
+from typing import Dict
+
+from flashcard_core.generation import generate_quiz, stream_flashcards
+from flashcard_core.jobs import ProgressCallback, register_handler
+from flashcard_core.repository import get_document_flashcards, is_flashcards_complete
+from flashcard_core.storage import ingest_pdf
+
+
+@register_handler("process_document")
+def process_document_job(job: Dict, report: ProgressCallback) -> Dict:
+    payload = job["payload"]
+    with open(payload["filepath"], "rb") as f:
+        data = f.read()
+
+    report(0.0, "Extracting text...")
+    document_id, content = ingest_pdf(
+        data, payload["title"], job["user_id"],
+        lambda done, total: report(0.5 * done / total, f"Extracted page {done} of {total}")
+    )
+
+    # Generate flashcards unless a duplicate upload already brought a complete
+    # set along; an interrupted earlier run resumes with its missing chunks.
+    # The document id is published first so the page can show cards as they
+    # are stored; a cancelled job stops at its next report.
+    report(0.5, "Generating flashcards...", {"document_id": document_id})
+    count = len(get_document_flashcards(document_id))
+    if not is_flashcards_complete(document_id):
+        with closing(stream_flashcards(document_id, content)) as batches:
+            for cards, done in batches:
+                count += len(cards)
+                report(0.5 + 0.5 * done, f"Generated {count} flashcards...")
+    if not count:
+        raise RuntimeError("Failed to generate flashcards.")
+
+    return {"document_id": document_id, "flashcards": count}
+
+
+@register_handler("generate_quiz")
+def generate_quiz_job(job: Dict, report: ProgressCallback) -> Dict:
+    document_id = job["payload"]["document_id"]
+
+    report(0.1, "Creating quiz...")
+    quiz_id = generate_quiz(document_id, job["user_id"])
+
+    return {"quiz_id": quiz_id}
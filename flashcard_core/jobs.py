@@ -0,0 +1,201 @@
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional
+
+from flashcard_core import db, metrics
+from flashcard_core.repository import generate_id
+
+
+JOB_POLL_INTERVAL = float(os.getenv("FLASHCARD_JOB_POLL_INTERVAL", "1.0"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("FLASHCARD_JOB_HEARTBEAT_INTERVAL", "15"))
+JOB_STALE_AFTER = float(os.getenv("FLASHCARD_JOB_STALE_AFTER", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("FLASHCARD_JOB_MAX_ATTEMPTS", "3"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ProgressCallback = Callable[..., None]
+JobHandler = Callable[[Dict, ProgressCallback], Dict]
+
+_JOB_COLUMNS = "id, user_id, kind, payload, status, progress, message, result, error, attempts, created_at"
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+class JobCancelled(BaseException):
+    # Not an Exception: a cancel is a control-flow exit, so handlers' error
+    # handling lets it through and metrics.timer doesn't count it as an error.
+    pass
+
+
+def register_handler(kind: str):
+    def register(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def _row_to_job(row: tuple) -> Dict:
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "kind": row[2],
+        "payload": json.loads(row[3]),
+        "status": row[4],
+        "progress": row[5],
+        "message": row[6],
+        "result": json.loads(row[7]) if row[7] else None,
+        "error": row[8],
+        "attempts": row[9],
+        "created_at": row[10],
+    }
+
+
+def enqueue(kind: str, user_id: str, payload: Dict) -> str:
+    job_id = generate_id()
+    db.execute(
+        "INSERT INTO jobs (id, user_id, kind, payload, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (job_id, user_id, kind, json.dumps(payload), QUEUED, time.time())
+    )
+    return job_id
+
+def get_job(job_id: str) -> Optional[Dict]:
+    row = db.fetch_one(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,))
+    return _row_to_job(row) if row else None
+
+def get_user_jobs(user_id: str, limit: int = 20) -> List[Dict]:
+    rows = db.fetch_all(
+        f"SELECT {_JOB_COLUMNS} FROM jobs WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+        (user_id, limit)
+    )
+    return [_row_to_job(row) for row in rows]
+
+def claim_next(worker_id: str) -> Optional[Dict]:
+    now = time.time()
+    with db.transaction() as conn:
+        row = conn.execute(
+            f"SELECT {_JOB_COLUMNS} FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+            (QUEUED,)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            """UPDATE jobs SET status = ?, worker_id = ?, attempts = attempts + 1,
+                   started_at = ?, heartbeat_at = ?
+               WHERE id = ?""",
+            (RUNNING, worker_id, now, now, row[0])
+        )
+    job = _row_to_job(row)
+    job["attempts"] += 1
+    return job
+
+def heartbeat(job_id: str):
+    db.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+
+def update_progress(job_id: str, progress: float, message: str = "", result: Optional[Dict] = None):
+    # `result` publishes partial output (e.g. the document id) while the job runs.
+    # Progress reports double as cancellation points for the handler.
+    updated = db.execute(
+        """UPDATE jobs SET progress = ?, message = ?, result = COALESCE(?, result), heartbeat_at = ?
+           WHERE id = ? AND status = ?""",
+        (max(0.0, min(1.0, progress)), message, json.dumps(result) if result is not None else None,
+         time.time(), job_id, RUNNING)
+    )
+    if not updated:
+        raise JobCancelled(job_id)
+
+def cancel(job_id: str) -> bool:
+    return db.execute(
+        "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+        (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+    ) > 0
+
+def complete(job_id: str, result: Dict):
+    db.execute(
+        "UPDATE jobs SET status = ?, progress = 1.0, result = ?, finished_at = ? WHERE id = ? AND status = ?",
+        (DONE, json.dumps(result), time.time(), job_id, RUNNING)
+    )
+
+def fail(job_id: str, error: str):
+    db.execute(
+        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+        (FAILED, error, time.time(), job_id, RUNNING)
+    )
+
+def requeue_stale(stale_after: float = JOB_STALE_AFTER) -> int:
+    # Jobs whose worker stopped heartbeating (crash, restart) go back on the
+    # queue, or fail once they have used up their attempts.
+    cutoff = time.time() - stale_after
+    with db.transaction() as conn:
+        conn.execute(
+            """UPDATE jobs SET status = ?, error = 'worker stopped responding', finished_at = ?
+               WHERE status = ? AND heartbeat_at < ? AND attempts >= ?""",
+            (FAILED, time.time(), RUNNING, cutoff, JOB_MAX_ATTEMPTS)
+        )
+        return conn.execute(
+            "UPDATE jobs SET status = ?, worker_id = NULL WHERE status = ? AND heartbeat_at < ?",
+            (QUEUED, RUNNING, cutoff)
+        ).rowcount
+
+
+def run_job(job: Dict):
+    handler = _handlers.get(job["kind"])
+    if handler is None:
+        fail(job["id"], f"No handler registered for job kind '{job['kind']}'")
+        return
+
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+            heartbeat(job["id"])
+
+    beater = threading.Thread(target=beat, daemon=True)
+    beater.start()
+    try:
+        # Every span recorded while the job runs is tagged with the job id.
+        with metrics.request_context(job["id"]), metrics.timer("job", kind=job["kind"]):
+            result = handler(job, lambda progress, message="", partial=None: update_progress(
+                job["id"], progress, message, partial
+            ))
+        complete(job["id"], result or {})
+    except JobCancelled:
+        pass
+    except Exception as e:
+        traceback.print_exc()
+        fail(job["id"], str(e))
+    finally:
+        stop.set()
+        beater.join()
+
+
+def run_worker(worker_id: Optional[str] = None, stop: Optional[threading.Event] = None,
+               poll_interval: float = JOB_POLL_INTERVAL):
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    stop = stop or threading.Event()
+    last_sweep = 0.0
+
+    while not stop.is_set():
+        if time.time() - last_sweep > JOB_STALE_AFTER / 2:
+            requeue_stale()
+            last_sweep = time.time()
+
+        job = claim_next(worker_id)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+
+
+def start_worker_threads(count: int) -> threading.Event:
+    stop = threading.Event()
+    for i in range(count):
+        threading.Thread(target=run_worker, kwargs={"stop": stop}, name=f"job-worker-{i}", daemon=True).start()
+    return stop
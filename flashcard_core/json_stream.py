@@ -0,0 +1,132 @@
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+FLASHCARD_FIELDS = ("front", "back")
+QUESTION_FIELDS = ("question_text", "correct_answer", "option1", "option2", "option3")
+
+_STRUCTURAL = re.compile(r'[{}\[\]"\\]')
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def validate(obj, fields: Tuple[str, ...]) -> Optional[Dict[str, str]]:
+    # Keeps exactly `fields`, each a non-empty string after stripping; numbers
+    # and booleans are accepted as their text. Anything else rejects the object.
+    if not isinstance(obj, dict):
+        return None
+    item = {}
+    for field in fields:
+        value = obj.get(field)
+        if isinstance(value, (int, float)):
+            value = str(value)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        item[field] = value.strip()
+    return item
+
+
+class JsonObjectStream:
+    # Incremental extractor for the JSON objects in an LLM response. Text is fed
+    # in pieces as it arrives; every outermost {...} is parsed as soon as its
+    # closing brace is seen, so prose, code fences and a truncated tail cost
+    # only the objects they actually break.
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        self.rejected = 0
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> List[Dict[str, str]]:
+        items: List[Dict[str, str]] = []
+        position = 0
+        while position < len(text):
+            if self._depth == 0:
+                start = text.find("{", position)
+                if start < 0:
+                    break
+                self._parts, self._depth, self._in_string, self._escape = [], 1, False, False
+                position = start + 1
+                mark = start
+            else:
+                mark = position
+
+            while position < len(text) and self._depth:
+                if self._escape:
+                    self._escape = False
+                    position += 1
+                    continue
+                match = _STRUCTURAL.search(text, position)
+                if match is None:
+                    position = len(text)
+                    break
+                char, position = match.group(), match.end()
+                if self._in_string:
+                    if char == "\\":
+                        self._escape = True
+                    elif char == '"':
+                        self._in_string = False
+                elif char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+
+            self._parts.append(text[mark:position])
+            if self._depth == 0:
+                items.extend(self._complete("".join(self._parts)))
+                self._parts = []
+        return items
+
+    def close(self) -> List[Dict[str, str]]:
+        # End of stream: an unterminated object may still contain complete ones
+        # (e.g. the response was cut off inside a wrapper object).
+        if not self._depth:
+            return []
+        text, self._depth, self._parts = "".join(self._parts), 0, []
+        return self._salvage(text)
+
+    def _complete(self, text: str) -> List[Dict[str, str]]:
+        obj = _loads(text)
+        if obj is None:
+            return self._salvage(text)
+
+        item = validate(obj, self.fields)
+        if item:
+            return [item]
+
+        # A wrapper such as {"flashcards": [...]}: take the valid list members.
+        nested = [validate(member, self.fields) for value in obj.values() if isinstance(value, list)
+                  for member in value]
+        if any(nested):
+            self.rejected += nested.count(None)
+            return [member for member in nested if member]
+
+        self.rejected += 1
+        return []
+
+    def _salvage(self, text: str) -> List[Dict[str, str]]:
+        inner = JsonObjectStream(self.fields)
+        items = inner.feed(text[1:]) + inner.close()
+        self.rejected += inner.rejected + (0 if items else 1)
+        return items
+
+
+def _loads(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+    except ValueError:
+        return None
+
+
+def parse_objects(text: str, fields: Tuple[str, ...]) -> Tuple[List[Dict[str, str]], int]:
+    # Returns the valid objects and how many candidates were rejected.
+    stream = JsonObjectStream(fields)
+    items = stream.feed(text) + stream.close()
+    return items, stream.rejected
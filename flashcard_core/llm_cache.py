@@ -0,0 +1,201 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from flashcard_core import db, metrics
+
+
+LLM_CACHE_FILE = os.getenv("FLASHCARD_LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL = float(os.getenv("FLASHCARD_LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("FLASHCARD_LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# A hit only rewrites last_access when the stored value is older than this, so
+# most lookups stay read-only; recency is kept to within this interval.
+LLM_CACHE_TOUCH_INTERVAL = float(os.getenv("FLASHCARD_LLM_CACHE_TOUCH_INTERVAL", "3600"))
+
+# Eviction trims to this fraction of the budget so a full cache does not evict
+# on every put, a batch of least recently used entries at a time.
+_EVICT_TO = 0.9
+_EVICT_BATCH = 64
+# Other processes write to the same file; the running size total is re-read
+# from the database this often (in puts) as well as before evicting.
+_RESYNC_PUTS = 100
+
+
+class ResponseCache:
+    # Prompt -> response cache in its own SQLite file so cache traffic never
+    # contends with the application database's write lock.
+    def __init__(self, path: str = LLM_CACHE_FILE, ttl: float = LLM_CACHE_TTL,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES, touch_interval: float = LLM_CACHE_TOUCH_INTERVAL):
+        self.pool = db.get_pool(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._counters_lock = threading.Lock()
+        self._size_lock = threading.Lock()
+        self._puts = 0
+
+        with self.pool.transaction() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                template_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            ''')
+            # (last_access, size) covers both the size total and picking
+            # eviction victims, without reading the stored responses.
+            conn.execute("DROP INDEX IF EXISTS idx_llm_responses_last_access")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_lru ON llm_responses (last_access, size)")
+            self._bytes = self._total(conn)
+
+    @staticmethod
+    def make_key(model: str, template_version: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, template_version, prompt):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._counters_lock:
+            self._counters[name] += amount
+
+    def get(self, model: str, template_version: str, prompt: str) -> Optional[str]:
+        key = self.make_key(model, template_version, prompt)
+        now = time.time()
+
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT response, size, created_at, last_access FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._count("misses")
+                return None
+
+            response, size, created_at, last_access = row
+            # Single statements on an autocommit connection: no explicit
+            # transaction is held around a lookup.
+            if now - created_at > self.ttl:
+                if conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,)).rowcount:
+                    self._add_bytes(-size)
+                self._count("expired")
+                self._count("misses")
+                return None
+            if now - last_access > self.touch_interval:
+                conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+
+        self._count("hits")
+        return response
+
+    def put(self, model: str, template_version: str, prompt: str, response: str):
+        key = self.make_key(model, template_version, prompt)
+        now = time.time()
+        size = len(response.encode())
+
+        with self.pool.transaction() as conn:
+            replaced = conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                """INSERT OR REPLACE INTO llm_responses
+                   (key, model, template_version, response, size, created_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (key, model, template_version, response, size, now, now)
+            )
+            total = self._add_bytes(size - (replaced[0] if replaced else 0))
+            with self._size_lock:
+                self._puts += 1
+                resync = self._puts % _RESYNC_PUTS == 0
+            if total > self.max_bytes or resync:
+                self._evict(conn)
+
+    @staticmethod
+    def _total(conn) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+
+    def _add_bytes(self, amount: int) -> int:
+        with self._size_lock:
+            self._bytes += amount
+            return self._bytes
+
+    def _evict(self, conn):
+        # The running total only sees this process's writes, so the real one is
+        # read before deciding; then least recently used entries go in batches
+        # until the cache is back under _EVICT_TO of its budget.
+        total = self._total(conn)
+        evicted = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * _EVICT_TO
+            while total > target:
+                victims = conn.execute(
+                    "SELECT rowid, size FROM llm_responses ORDER BY last_access LIMIT ?", (_EVICT_BATCH,)
+                ).fetchall()
+                if not victims:
+                    break
+                for rowid, size in victims:
+                    if total <= target:
+                        break
+                    conn.execute("DELETE FROM llm_responses WHERE rowid = ?", (rowid,))
+                    total -= size
+                    evicted += 1
+        with self._size_lock:
+            self._bytes = total
+        self._count("evictions", evicted)
+
+    def delete(self, model: str, template_version: str, prompt: str):
+        key = self.make_key(model, template_version, prompt)
+        with self.pool.transaction() as conn:
+            row = conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._add_bytes(-row[0])
+
+    def clear(self):
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM llm_responses")
+        with self._size_lock:
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self.pool.connection() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+        with self._counters_lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        counters.update({
+            "entries": entries,
+            "bytes": size,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        })
+        return counters
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+            metrics.register_collector(_collect)
+        return _cache
+
+
+def _collect() -> List[str]:
+    stats = get_cache().stats()
+    lines = []
+    for name in ("hits", "misses", "expired", "evictions"):
+        lines += [f"# TYPE flashcard_llm_cache_{name}_total counter", f"flashcard_llm_cache_{name}_total {stats[name]}"]
+    for name in ("entries", "bytes"):
+        lines += [f"# TYPE flashcard_llm_cache_{name} gauge", f"flashcard_llm_cache_{name} {stats[name]}"]
+    return lines
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from flashcard_core import metrics
+
+
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "15"))
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "5"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "120"))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "1.0"))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "30.0"))
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    if callable(code):
+        code = code()
+    return getattr(code, "value", code) in RETRYABLE_STATUS_CODES or type(error).__name__ in {
+        "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "TooManyRequests",
+    }
+
+
+class GeminiClient:
+    # Runs all model calls on one background event loop so the rate limit and
+    # concurrency bound are shared by every Streamlit session in the process.
+    def __init__(self, model: Any, requests_per_minute: float = GEMINI_RPM, burst: int = GEMINI_BURST,
+                 max_concurrency: int = GEMINI_MAX_CONCURRENCY, max_retries: int = GEMINI_MAX_RETRIES,
+                 timeout: float = GEMINI_TIMEOUT, backoff_base: float = GEMINI_BACKOFF_BASE,
+                 backoff_max: float = GEMINI_BACKOFF_MAX):
+        self.model = model
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="gemini-client", daemon=True)
+        self._thread.start()
+
+        async def create_primitives():
+            return TokenBucket(requests_per_minute / 60.0, burst), asyncio.Semaphore(max_concurrency)
+        self._bucket, self._semaphore = asyncio.run_coroutine_threadsafe(create_primitives(), self._loop).result()
+
+    async def _call(self, prompt: str, on_text: Optional[Callable[[str], None]] = None) -> str:
+        if on_text is not None:
+            return await self._stream(prompt, on_text)
+        if hasattr(self.model, "generate_content_async"):
+            response = await self.model.generate_content_async(prompt)
+        else:
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
+        return response.text
+
+    async def _stream(self, prompt: str, on_text: Callable[[str], None]) -> str:
+        parts: List[str] = []
+        if hasattr(self.model, "generate_content_async"):
+            async for chunk in await self.model.generate_content_async(prompt, stream=True):
+                parts.append(chunk.text)
+                on_text(chunk.text)
+        else:
+            def consume():
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    parts.append(chunk.text)
+                    on_text(chunk.text)
+            await asyncio.to_thread(consume)
+        return "".join(parts)
+
+    async def generate(self, prompt: str, request_id: Optional[str] = None,
+                       on_text: Optional[Callable[[str], None]] = None) -> str:
+        # With `on_text`, the response is streamed and each piece passed to it as
+        # it arrives (on the client's thread).
+        streamed = False
+
+        def forward(text: str):
+            nonlocal streamed
+            streamed = True
+            on_text(text)
+
+        with metrics.request_context(request_id):
+            async with self._semaphore:
+                attempt = 0
+                while True:
+                    with metrics.timer("llm_wait"):
+                        await self._bucket.acquire()
+                    try:
+                        with metrics.timer("llm_call", stream=on_text is not None):
+                            return await asyncio.wait_for(self._call(prompt, on_text and forward), self.timeout)
+                    except Exception as e:
+                        # A retry would replay text the caller has already consumed.
+                        if attempt >= self.max_retries or not is_retryable(e) or streamed:
+                            raise
+                    # Exponential backoff with full jitter.
+                    metrics.count("llm_retries")
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                    await asyncio.sleep(random.uniform(0, delay))
+                    attempt += 1
+
+    def submit(self, prompt: str, on_text: Optional[Callable[[str], None]] = None) -> Future:
+        # Cancelling the returned future cancels the in-flight request. The caller's
+        # request id is carried over so the call's spans are attributed to it.
+        return asyncio.run_coroutine_threadsafe(
+            self.generate(prompt, metrics.current_request_id(), on_text), self._loop
+        )
+
+    def generate_many(self, prompts: List[str]) -> List[Union[str, BaseException]]:
+        futures = [self.submit(prompt) for prompt in prompts]
+        results: List[Union[str, BaseException]] = []
+        try:
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+        finally:
+            for future in futures:
+                future.cancel()
+        return results
+
+    def stream_many(self, prompts: List[str]) -> Iterator[Tuple[int, str, Union[str, BaseException, None]]]:
+        # Streams all prompts concurrently, yielding (index, text, None) for each
+        # piece as it arrives and (index, "", result) when a prompt finishes, where
+        # result is the full response or the raised exception. Closing the
+        # generator early cancels whatever is still in flight.
+        events: "queue.Queue[Tuple[int, str, Union[str, BaseException, None]]]" = queue.Queue()
+
+        def finished(index: int, future: Future):
+            if not future.cancelled():
+                events.put((index, "", future.exception() or future.result()))
+
+        futures = []
+        for index, prompt in enumerate(prompts):
+            future = self.submit(prompt, lambda text, index=index: events.put((index, text, None)))
+            future.add_done_callback(lambda future, index=index: finished(index, future))
+            futures.append(future)
+
+        try:
+            remaining = len(futures)
+            while remaining:
+                event = events.get()
+                if event[2] is not None:
+                    remaining -= 1
+                yield event
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+_client: Optional[GeminiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client(model: Any) -> GeminiClient:
+    global _client
+    with _client_lock:
+        if _client is None or _client.model is not model:
+            if _client is not None:
+                _client.close()
+            _client = GeminiClient(model)
+        return _client
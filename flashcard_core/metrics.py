@@ -0,0 +1,256 @@
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RECENT_SPANS = int(os.getenv("FLASHCARD_METRICS_RECENT_SPANS", "500"))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Dict[Labels, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> Dict[Labels, Dict]:
+        with self._lock:
+            return {labels: {"buckets": list(counts), "sum": total, "count": count}
+                    for labels, (counts, total, count) in self._values.items()}
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation, like
+        # Prometheus' histogram_quantile without interpolation.
+        sample = self.samples().get(_labels(labels))
+        if not sample or not sample["count"]:
+            return None
+        rank, seen = q * sample["count"], 0
+        for bound, count in zip(self.buckets + (float("inf"),), sample["buckets"]):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, sample in sorted(self.samples().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), sample["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {sample['sum']:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {sample['count']}")
+        return lines
+
+
+# Metrics are per process: the Streamlit server and each worker.py process
+# keep their own and are scraped separately.
+STAGE_SECONDS = Histogram("flashcard_stage_seconds", "Time spent in each processing stage.")
+STAGE_ERRORS = Counter("flashcard_stage_errors_total", "Processing stages that raised an error.")
+EVENTS = Counter("flashcard_events_total", "Counts of notable events (pages extracted, cards generated, retries, ...).")
+
+_metrics = [STAGE_SECONDS, STAGE_ERRORS, EVENTS]
+_collectors: List[Callable[[], List[str]]] = []
+_spans: Deque[Dict] = deque(maxlen=RECENT_SPANS)
+
+
+def register_collector(collect: Callable[[], List[str]]):
+    # `collect` returns exposition lines computed at scrape time (e.g. gauges
+    # read from another component).
+    _collectors.append(collect)
+
+
+_health_check: Optional[Callable[[], Dict]] = None
+
+
+def set_health_check(check: Callable[[], Dict]):
+    # Served as JSON at /healthz: 200 when check()["ok"] is true, 503 otherwise.
+    global _health_check
+    _health_check = check
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    # Spans recorded inside the block are tagged with this id; nested contexts
+    # keep the outer id unless a new one is given.
+    request_id = request_id or current_request_id() or uuid.uuid4().hex
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+@contextmanager
+def timer(stage: str, **labels):
+    start = time.perf_counter()
+    started_at = time.time()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        # Control-flow exits (cancellation, Streamlit reruns) are not errors.
+        error = type(e).__name__
+        STAGE_ERRORS.inc(stage=stage, **labels)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage, **labels)
+        _spans.append({
+            "request_id": current_request_id(),
+            "stage": stage,
+            "labels": dict(labels),
+            "started_at": started_at,
+            "seconds": elapsed,
+            "error": error,
+        })
+
+
+def timed(stage: str, **labels):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(event: str, amount: float = 1, **labels):
+    EVENTS.inc(amount, event=event, **labels)
+
+
+def observe(stage: str, seconds: float, **labels):
+    # For durations not bounded by one block, e.g. time to the first streamed card.
+    STAGE_SECONDS.observe(seconds, stage=stage, **labels)
+
+
+def recent_spans(request_id: Optional[str] = None) -> List[Dict]:
+    spans = list(_spans)
+    if request_id:
+        spans = [span for span in spans if span["request_id"] == request_id]
+    return spans
+
+
+def stage_summary() -> List[Dict]:
+    errors = STAGE_ERRORS.samples()
+    summary = []
+    for labels, sample in sorted(STAGE_SECONDS.samples().items()):
+        label_dict = dict(labels)
+        summary.append({
+            **label_dict,
+            "count": sample["count"],
+            "errors": int(errors.get(labels, 0)),
+            "mean_seconds": sample["sum"] / sample["count"] if sample["count"] else 0.0,
+            "p50_seconds": STAGE_SECONDS.quantile(0.5, **label_dict),
+            "p95_seconds": STAGE_SECONDS.quantile(0.95, **label_dict),
+        })
+    return summary
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.expose())
+    for collect in _collectors:
+        try:
+            lines.extend(collect())
+        except Exception as e:
+            lines.append(f"# collector failed: {type(e).__name__}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            code, content_type = 200, "text/plain; version=0.0.4; charset=utf-8"
+            body = render_prometheus().encode()
+        elif path == "/healthz" and _health_check is not None:
+            status = _health_check()
+            code, content_type = (200 if status["ok"] else 503), "application/json"
+            body = json.dumps(status).encode()
+        else:
+            self.send_error(404)
+            return
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name=f"metrics-{port}", daemon=True).start()
+    return server
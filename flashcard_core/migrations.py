@@ -0,0 +1,418 @@
+import hashlib
+import os
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+from flashcard_core import db
+from flashcard_core.compression import compress_text, decompress_text
+
+
+Migration = Tuple[int, str, Callable[[sqlite3.Connection], None]]
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    def register(func: Callable[[sqlite3.Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"Migration {version} must be newer than {MIGRATIONS[-1][0]}")
+        MIGRATIONS.append((version, description, func))
+        return func
+    return register
+
+
+@migration(1, "base schema")
+def _base_schema(conn: sqlite3.Connection):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS documents (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        filepath TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS flashcards (
+        id TEXT PRIMARY KEY,
+        document_id TEXT NOT NULL,
+        front TEXT NOT NULL,
+        back TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (document_id) REFERENCES documents (id)
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS quizzes (
+        id TEXT PRIMARY KEY,
+        document_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (document_id) REFERENCES documents (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS questions (
+        id TEXT PRIMARY KEY,
+        quiz_id TEXT NOT NULL,
+        question_text TEXT NOT NULL,
+        correct_answer TEXT NOT NULL,
+        option1 TEXT NOT NULL,
+        option2 TEXT NOT NULL,
+        option3 TEXT NOT NULL,
+        FOREIGN KEY (quiz_id) REFERENCES quizzes (id)
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS quiz_attempts (
+        id TEXT PRIMARY KEY,
+        quiz_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        total_questions INTEGER NOT NULL,
+        completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (quiz_id) REFERENCES quizzes (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+
+@migration(2, "indexes for per-user and per-parent lookups")
+def _lookup_indexes(conn: sqlite3.Connection):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_user_created ON documents (user_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_flashcards_document ON flashcards (document_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_quizzes_user_created ON quizzes (user_id, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_quiz ON questions (quiz_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user_completed ON quiz_attempts (user_id, completed_at)")
+
+
+@migration(3, "content hash on documents for upload deduplication")
+def _document_content_hash(conn: sqlite3.Connection):
+    conn.execute("ALTER TABLE documents ADD COLUMN content_hash TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents (content_hash, user_id)")
+
+    # Backfill from the stored files where they are still on disk.
+    for document_id, filepath in conn.execute("SELECT id, filepath FROM documents").fetchall():
+        if not os.path.exists(filepath):
+            continue
+        with open(filepath, "rb") as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        conn.execute("UPDATE documents SET content_hash = ? WHERE id = ?", (content_hash, document_id))
+
+
+@migration(4, "background job queue")
+def _jobs(conn: sqlite3.Connection):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT,
+        result TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker_id TEXT,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        heartbeat_at REAL,
+        finished_at REAL,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user_created ON jobs (user_id, created_at)")
+
+
+@migration(5, "flashcard set version on documents")
+def _flashcard_version(conn: sqlite3.Connection):
+    conn.execute("ALTER TABLE documents ADD COLUMN flashcard_version INTEGER NOT NULL DEFAULT 0")
+
+
+@migration(6, "keyset pagination index for a user's documents")
+def _documents_keyset_index(conn: sqlite3.Connection):
+    conn.execute("DROP INDEX IF EXISTS idx_documents_user_created")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_user_created_id ON documents (user_id, created_at, id)")
+
+
+def _create_fts_triggers(conn: sqlite3.Connection, table: str, fts: str, columns: Tuple[str, ...],
+                         fts_columns: Optional[Tuple[str, ...]] = None, transform: str = ""):
+    watched = ", ".join(columns)
+    names = ", ".join(fts_columns or columns)
+    new_values = ", ".join(f"{transform}(new.{column})" for column in columns)
+    old_values = ", ".join(f"{transform}(old.{column})" for column in columns)
+    insert = f"INSERT INTO {fts} (rowid, {names}) VALUES (new.rowid, {new_values});"
+    delete = f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old_values});"
+
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {watched} ON {table} BEGIN {delete} {insert} END")
+
+
+@migration(7, "full-text search indexes")
+def _search_indexes(conn: sqlite3.Connection):
+    # Documents are indexed contentless (the text is already stored once);
+    # flashcards and questions use external content so snippets can be shown.
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, body, content='')")
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts "
+        "USING fts5(front, back, content='flashcards', content_rowid='rowid')"
+    )
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts "
+        "USING fts5(question_text, correct_answer, content='questions', content_rowid='rowid')"
+    )
+
+    _create_fts_triggers(conn, "documents", "documents_fts", ("title", "content"), ("title", "body"))
+    _create_fts_triggers(conn, "flashcards", "flashcards_fts", ("front", "back"))
+    _create_fts_triggers(conn, "questions", "questions_fts", ("question_text", "correct_answer"))
+
+    conn.execute("INSERT INTO documents_fts (rowid, title, body) SELECT rowid, title, content FROM documents")
+    conn.execute("INSERT INTO flashcards_fts (flashcards_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+
+
+@migration(8, "document text stored as chunk rows")
+def _document_chunks(conn: sqlite3.Connection):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS document_chunks (
+        id INTEGER PRIMARY KEY,
+        document_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        UNIQUE (document_id, position),
+        FOREIGN KEY (document_id) REFERENCES documents (id)
+    )
+    ''')
+    conn.execute("ALTER TABLE documents ADD COLUMN chunk_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE documents ADD COLUMN content_length INTEGER NOT NULL DEFAULT 0")
+
+    # The body index moves from whole documents to chunks; titles keep their own index.
+    for action in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS documents_fts_{action}")
+    conn.execute("DROP TABLE IF EXISTS documents_fts")
+    conn.execute("CREATE VIRTUAL TABLE documents_fts USING fts5(title, content='')")
+    conn.execute("CREATE VIRTUAL TABLE document_chunks_fts USING fts5(body, content='')")
+    _create_fts_triggers(conn, "documents", "documents_fts", ("title",))
+    _create_fts_triggers(conn, "document_chunks", "document_chunks_fts", ("content",), ("body",))
+
+    # Existing text was extracted as one string, so split it into fixed-size pieces.
+    chunk_size = 4000
+    cursor = conn.execute("SELECT id, content FROM documents")
+    for document_id, content in cursor.fetchall():
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        conn.executemany(
+            "INSERT INTO document_chunks (document_id, position, content) VALUES (?, ?, ?)",
+            [(document_id, position, chunk) for position, chunk in enumerate(chunks)]
+        )
+        conn.execute(
+            "UPDATE documents SET chunk_count = ?, content_length = ? WHERE id = ?",
+            (len(chunks), len(content), document_id)
+        )
+
+    conn.execute("ALTER TABLE documents DROP COLUMN content")
+    conn.execute("INSERT INTO documents_fts (rowid, title) SELECT rowid, title FROM documents")
+
+
+@migration(9, "compressed document chunk text")
+def _compressed_chunks(conn: sqlite3.Connection):
+    # Recreate the triggers first so the rewrite below (and every later write)
+    # reaches the search index as plain text.
+    for action in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS document_chunks_fts_{action}")
+    _create_fts_triggers(conn, "document_chunks", "document_chunks_fts", ("content",), ("body",),
+                         transform="decompress_text")
+
+    rows = conn.execute("SELECT id, content FROM document_chunks").fetchall()
+    conn.executemany(
+        "UPDATE document_chunks SET content = ? WHERE id = ?",
+        [(compress_text(decompress_text(content)), chunk_id) for chunk_id, content in rows]
+    )
+
+
+@migration(10, "per-user progress rollups")
+def _progress_rollups(conn: sqlite3.Connection):
+    # score_sum holds the sum of per-attempt percentages, so the average score
+    # is score_sum / total_attempts without revisiting quiz_attempts.
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS user_progress (
+        user_id TEXT PRIMARY KEY,
+        total_attempts INTEGER NOT NULL DEFAULT 0,
+        total_correct INTEGER NOT NULL DEFAULT 0,
+        total_questions INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS user_progress_daily (
+        user_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        total_correct INTEGER NOT NULL DEFAULT 0,
+        total_questions INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    ) WITHOUT ROWID
+    ''')
+
+    percentage = "CASE WHEN total_questions > 0 THEN score * 100.0 / total_questions ELSE 0 END"
+    conn.execute(f'''
+    INSERT INTO user_progress (user_id, total_attempts, total_correct, total_questions, score_sum)
+    SELECT user_id, COUNT(*), SUM(score), SUM(total_questions), SUM({percentage})
+    FROM quiz_attempts
+    GROUP BY user_id
+    ''')
+    conn.execute(f'''
+    INSERT INTO user_progress_daily (user_id, day, attempts, total_correct, total_questions, score_sum)
+    SELECT user_id, date(completed_at), COUNT(*), SUM(score), SUM(total_questions), SUM({percentage})
+    FROM quiz_attempts
+    GROUP BY user_id, date(completed_at)
+    ''')
+
+
+@migration(11, "per-question quiz responses")
+def _question_responses(conn: sqlite3.Connection):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS question_responses (
+        id INTEGER PRIMARY KEY,
+        attempt_id TEXT NOT NULL,
+        quiz_id TEXT NOT NULL,
+        question_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        answer TEXT,
+        is_correct INTEGER NOT NULL,
+        answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (attempt_id, question_id),
+        FOREIGN KEY (quiz_id) REFERENCES quizzes (id),
+        FOREIGN KEY (question_id) REFERENCES questions (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_question_responses_question ON question_responses (question_id, is_correct)")
+
+
+@migration(12, "spaced-repetition card state")
+def _card_states(conn: sqlite3.Connection):
+    # One row per (user, card); the (user_id, due_at) index makes "next N due
+    # cards" a range scan. due_at uses CURRENT_TIMESTAMP's format (UTC).
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS card_states (
+        user_id TEXT NOT NULL,
+        flashcard_id TEXT NOT NULL,
+        repetitions INTEGER NOT NULL DEFAULT 0,
+        interval_days REAL NOT NULL DEFAULT 0,
+        ease REAL NOT NULL DEFAULT 2.5,
+        due_at TIMESTAMP NOT NULL,
+        reviews INTEGER NOT NULL DEFAULT 0,
+        lapses INTEGER NOT NULL DEFAULT 0,
+        last_reviewed_at TIMESTAMP,
+        PRIMARY KEY (user_id, flashcard_id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (flashcard_id) REFERENCES flashcards (id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_card_states_user_due ON card_states (user_id, due_at)")
+
+    # New cards enter the queue as soon as they are created, whichever path inserts them.
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS card_states_insert AFTER INSERT ON flashcards BEGIN
+        INSERT OR IGNORE INTO card_states (user_id, flashcard_id, due_at)
+        SELECT user_id, new.id, COALESCE(new.created_at, CURRENT_TIMESTAMP) FROM documents WHERE id = new.document_id;
+    END
+    ''')
+    conn.execute('''
+    INSERT OR IGNORE INTO card_states (user_id, flashcard_id, due_at)
+    SELECT d.user_id, f.id, COALESCE(f.created_at, CURRENT_TIMESTAMP)
+    FROM flashcards f
+    JOIN documents d ON d.id = f.document_id
+    ''')
+
+
+@migration(13, "chunk search index written by the repository")
+def _chunk_index_without_triggers(conn: sqlite3.Connection):
+    # The triggers from version 9 call decompress_text, which only pool
+    # connections register, so any other client (the sqlite3 CLI, backup
+    # scripts) could not write document_chunks at all. The repository now
+    # indexes chunk text itself; the index already holds plain text.
+    for action in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS document_chunks_fts_{action}")
+
+
+@migration(14, "per-chunk flashcard generation progress")
+def _flashcard_generation_progress(conn: sqlite3.Connection):
+    # Cards are stored as they stream in, so "has cards" no longer means
+    # "generated": a cancelled or failed run leaves part of the set. Chunks
+    # whose generation finished are recorded, and the document is flagged once
+    # all of them are, so an interrupted run can resume with the rest.
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS flashcard_chunks (
+        document_id TEXT NOT NULL,
+        chunk_index INTEGER NOT NULL,
+        PRIMARY KEY (document_id, chunk_index),
+        FOREIGN KEY (document_id) REFERENCES documents (id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute("ALTER TABLE documents ADD COLUMN flashcards_complete INTEGER NOT NULL DEFAULT 0")
+
+    # Earlier sets were generated in one go, so any document with cards is complete.
+    conn.execute('''
+    UPDATE documents SET flashcards_complete = 1
+    WHERE EXISTS (SELECT 1 FROM flashcards f WHERE f.document_id = documents.id)
+    ''')
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(target: Optional[int] = None) -> int:
+    with db.connection() as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        for version, description, func in MIGRATIONS:
+            if target is not None and version > target:
+                break
+            if version <= current_version(conn):
+                continue
+
+            with db.transaction():
+                # Another process may have applied it while we waited for the lock.
+                if version <= current_version(conn):
+                    continue
+                func(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+
+        return current_version(conn)
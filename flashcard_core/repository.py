@@ -0,0 +1,425 @@
+import hashlib
+import sqlite3
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+
+from flashcard_core import db, metrics
+from flashcard_core.compression import compress_text, decompress_text
+
+
+def hash_password(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def generate_id() -> str:
+    return str(uuid.uuid4())
+
+
+# Users
+def register_user(username: str, password: str, email: str) -> bool:
+    try:
+        db.execute(
+            "INSERT INTO users (id, username, password_hash, email) VALUES (?, ?, ?, ?)",
+            (generate_id(), username, hash_password(password), email)
+        )
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+def authenticate_user(username: str, password: str) -> Optional[str]:
+    result = db.fetch_one(
+        "SELECT id, password_hash FROM users WHERE username = ?",
+        (username,)
+    )
+
+    if result and result[1] == hash_password(password):
+        return result[0]
+    return None
+
+def get_username_by_id(user_id: str) -> str:
+    result = db.fetch_one("SELECT username FROM users WHERE id = ?", (user_id,))
+    return result[0] if result else ""
+
+def get_user_id_by_username(username: str) -> Optional[str]:
+    result = db.fetch_one("SELECT id FROM users WHERE username = ?", (username,))
+    return result[0] if result else None
+
+
+# Documents
+def insert_document(user_id: str, title: str, filepath: str, chunks: List[str],
+                    content_hash: Optional[str] = None) -> str:
+    # Text is stored as ordered chunks (one per PDF page) so it can be read in ranges.
+    document_id = generate_id()
+    with metrics.timer("db_write", table="documents"), db.transaction() as conn:
+        conn.execute(
+            """INSERT INTO documents (id, user_id, title, filepath, content_hash, chunk_count, content_length)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (document_id, user_id, title, filepath, content_hash, len(chunks), sum(len(c) for c in chunks))
+        )
+        conn.executemany(
+            "INSERT INTO document_chunks (document_id, position, content) VALUES (?, ?, ?)",
+            [(document_id, position, compress_text(chunk)) for position, chunk in enumerate(chunks)]
+        )
+        # The search index is written here rather than by a trigger, so the
+        # stored text can stay compressed without other clients needing an
+        # app-defined SQL function.
+        chunk_ids = conn.execute(
+            "SELECT id FROM document_chunks WHERE document_id = ? ORDER BY position", (document_id,)
+        ).fetchall()
+        conn.executemany(
+            "INSERT INTO document_chunks_fts (rowid, body) VALUES (?, ?)",
+            [(chunk_id, chunk) for (chunk_id,), chunk in zip(chunk_ids, chunks)]
+        )
+    return document_id
+
+def copy_document(source_id: str, user_id: str, title: str) -> str:
+    # A new document for `user_id` sharing the source's stored file and text.
+    document_id = generate_id()
+    with db.transaction() as conn:
+        conn.execute(
+            """INSERT INTO documents (id, user_id, title, filepath, content_hash, chunk_count, content_length)
+               SELECT ?, ?, ?, filepath, content_hash, chunk_count, content_length FROM documents WHERE id = ?""",
+            (document_id, user_id, title, source_id)
+        )
+        conn.execute(
+            """INSERT INTO document_chunks (document_id, position, content)
+               SELECT ?, position, content FROM document_chunks WHERE document_id = ? ORDER BY position""",
+            (document_id, source_id)
+        )
+        conn.execute(
+            """INSERT INTO document_chunks_fts (rowid, body)
+               SELECT id, decompress_text(content) FROM document_chunks WHERE document_id = ?""",
+            (document_id,)
+        )
+    return document_id
+
+def find_document_by_hash(content_hash: str, user_id: Optional[str] = None) -> Optional[str]:
+    if user_id is None:
+        result = db.fetch_one(
+            "SELECT id FROM documents WHERE content_hash = ? ORDER BY created_at LIMIT 1",
+            (content_hash,)
+        )
+    else:
+        result = db.fetch_one(
+            "SELECT id FROM documents WHERE content_hash = ? AND user_id = ? ORDER BY created_at LIMIT 1",
+            (content_hash, user_id)
+        )
+    return result[0] if result else None
+
+def get_user_documents(user_id: str) -> List[Dict]:
+    documents = db.fetch_all(
+        "SELECT id, title, created_at FROM documents WHERE user_id = ? ORDER BY created_at DESC",
+        (user_id,)
+    )
+    return [{"id": doc[0], "title": doc[1], "created_at": doc[2]} for doc in documents]
+
+def get_document_content(document_id: str) -> str:
+    return "".join(get_document_chunks(document_id))
+
+def get_document_chunk_count(document_id: str) -> int:
+    result = db.fetch_one("SELECT chunk_count FROM documents WHERE id = ?", (document_id,))
+    return result[0] if result else 0
+
+def get_document_chunks(document_id: str, start: int = 0, count: int = -1) -> List[str]:
+    chunks = db.fetch_all(
+        "SELECT content FROM document_chunks WHERE document_id = ? AND position >= ? ORDER BY position LIMIT ?",
+        (document_id, start, count)
+    )
+    return [decompress_text(chunk[0]) for chunk in chunks]
+
+def get_document_title(document_id: str) -> str:
+    result = db.fetch_one("SELECT title FROM documents WHERE id = ?", (document_id,))
+    return result[0] if result else ""
+
+
+# Flashcards
+def insert_flashcards(document_id: str, flashcards: List[Dict]):
+    # Rows are built before the write transaction opens, so it covers only the
+    # inserts themselves.
+    if not flashcards:
+        return
+    rows = [(generate_id(), document_id, card["front"], card["back"]) for card in flashcards]
+    with metrics.timer("db_write", table="flashcards"), db.transaction() as conn:
+        conn.executemany("INSERT INTO flashcards (id, document_id, front, back) VALUES (?, ?, ?, ?)", rows)
+        # Anything derived from the card set (e.g. PDF exports) is keyed on this.
+        conn.execute(
+            "UPDATE documents SET flashcard_version = flashcard_version + 1 WHERE id = ?",
+            (document_id,)
+        )
+
+def get_flashcard_version(document_id: str) -> int:
+    result = db.fetch_one("SELECT flashcard_version FROM documents WHERE id = ?", (document_id,))
+    return result[0] if result else 0
+
+def get_document_flashcards(document_id: str) -> List[Dict]:
+    flashcards = db.fetch_all(
+        "SELECT id, front, back FROM flashcards WHERE document_id = ?",
+        (document_id,)
+    )
+    return [{"id": card[0], "front": card[1], "back": card[2]} for card in flashcards]
+
+def get_generated_chunks(document_id: str) -> Set[int]:
+    rows = db.fetch_all("SELECT chunk_index FROM flashcard_chunks WHERE document_id = ?", (document_id,))
+    return {row[0] for row in rows}
+
+def mark_chunk_generated(document_id: str, chunk_index: int):
+    db.execute(
+        "INSERT OR IGNORE INTO flashcard_chunks (document_id, chunk_index) VALUES (?, ?)",
+        (document_id, chunk_index)
+    )
+
+def set_flashcards_complete(document_id: str):
+    db.execute("UPDATE documents SET flashcards_complete = 1 WHERE id = ?", (document_id,))
+
+def is_flashcards_complete(document_id: str) -> bool:
+    result = db.fetch_one("SELECT flashcards_complete FROM documents WHERE id = ?", (document_id,))
+    return bool(result and result[0])
+
+
+def copy_flashcards_from_duplicate(document_id: str) -> int:
+    # Reuse the cards of the earliest document with identical file bytes whose
+    # generation finished; a partial set would otherwise spread to every copy.
+    source = db.fetch_one(
+        """
+        SELECT src.id
+        FROM documents d
+        JOIN documents src ON src.content_hash = d.content_hash AND src.id != d.id
+        WHERE d.id = ?
+          AND src.flashcards_complete = 1
+          AND EXISTS (SELECT 1 FROM flashcards f WHERE f.document_id = src.id)
+        ORDER BY src.created_at
+        LIMIT 1
+        """,
+        (document_id,)
+    )
+    if not source:
+        return 0
+
+    flashcards = get_document_flashcards(source[0])
+    with db.transaction():
+        insert_flashcards(document_id, flashcards)
+        set_flashcards_complete(document_id)
+    return len(flashcards)
+
+
+_FLASHCARDS_PAGE = """
+WITH page AS (
+    SELECT d.id, d.title, d.created_at
+    FROM documents d
+    WHERE d.user_id = ?{after}
+      AND EXISTS (SELECT 1 FROM flashcards f WHERE f.document_id = d.id)
+    ORDER BY d.created_at DESC, d.id DESC
+    LIMIT ?
+),
+cards AS (
+    SELECT f.document_id, f.id, f.front, f.back,
+           ROW_NUMBER() OVER (PARTITION BY f.document_id ORDER BY f.rowid) AS position,
+           COUNT(*) OVER (PARTITION BY f.document_id) AS card_count
+    FROM flashcards f
+    WHERE f.document_id IN (SELECT id FROM page)
+)
+SELECT p.id, p.title, p.created_at, c.card_count, c.id, c.front, c.back
+FROM page p
+JOIN cards c ON c.document_id = p.id
+WHERE c.position <= ?
+ORDER BY p.created_at DESC, p.id DESC, c.position
+"""
+# The first page and later pages are separate statements so the cursor bound
+# is a plain range that SQLite can seek the (user_id, created_at, id) index on.
+_FIRST_FLASHCARDS_PAGE = _FLASHCARDS_PAGE.format(after="")
+_NEXT_FLASHCARDS_PAGE = _FLASHCARDS_PAGE.format(after="\n      AND (d.created_at, d.id) < (?, ?)")
+
+
+def get_flashcards_page(user_id: str, page_size: int, cursor: Optional[Tuple[str, str]] = None,
+                        cards_per_document: int = 20) -> Tuple[List[Dict], Optional[Tuple[str, str]]]:
+    # One page of the user's documents that have flashcards, newest first, with up to
+    # `cards_per_document` cards each, in a single query. `cursor` is the
+    # (created_at, id) of the last document on the previous page.
+    if cursor:
+        rows = db.fetch_all(_NEXT_FLASHCARDS_PAGE, (user_id, *cursor, page_size, cards_per_document))
+    else:
+        rows = db.fetch_all(_FIRST_FLASHCARDS_PAGE, (user_id, page_size, cards_per_document))
+
+    documents: List[Dict] = []
+    for row in rows:
+        if not documents or documents[-1]["id"] != row[0]:
+            documents.append({"id": row[0], "title": row[1], "created_at": row[2],
+                              "flashcard_count": row[3], "flashcards": []})
+        documents[-1]["flashcards"].append({"id": row[4], "front": row[5], "back": row[6]})
+
+    next_cursor = None
+    if len(documents) == page_size:
+        next_cursor = (documents[-1]["created_at"], documents[-1]["id"])
+    return documents, next_cursor
+
+
+# Quizzes
+def insert_quiz(quiz_id: str, document_id: str, user_id: str, title: str):
+    db.execute(
+        "INSERT INTO quizzes (id, document_id, user_id, title) VALUES (?, ?, ?, ?)",
+        (quiz_id, document_id, user_id, title)
+    )
+
+def insert_questions(quiz_id: str, questions: List[Dict]):
+    if not questions:
+        return
+    rows = [(generate_id(), quiz_id, question["question_text"], question["correct_answer"],
+             question["option1"], question["option2"], question["option3"]) for question in questions]
+    with metrics.timer("db_write", table="questions"), db.transaction() as conn:
+        conn.executemany(
+            """INSERT INTO questions
+               (id, quiz_id, question_text, correct_answer, option1, option2, option3)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            rows
+        )
+
+def get_quiz_questions(quiz_id: str) -> List[Dict]:
+    questions = db.fetch_all(
+        "SELECT id, question_text, correct_answer, option1, option2, option3 FROM questions WHERE quiz_id = ?",
+        (quiz_id,)
+    )
+    return [{
+        "id": q[0],
+        "question_text": q[1],
+        "correct_answer": q[2],
+        "options": [q[2], q[3], q[4], q[5]]  # Correct answer + wrong options
+    } for q in questions]
+
+def get_question_accuracy(quiz_id: str) -> Dict[str, Dict]:
+    rows = db.fetch_all(
+        """
+        SELECT r.question_id, COUNT(*), SUM(r.is_correct)
+        FROM questions q
+        JOIN question_responses r ON r.question_id = q.id
+        WHERE q.quiz_id = ?
+        GROUP BY r.question_id
+        """,
+        (quiz_id,)
+    )
+    return {row[0]: {"answers": row[1], "accuracy": round(row[2] * 100.0 / row[1], 2)} for row in rows}
+
+def find_duplicate_questions(document_id: str) -> List[Dict]:
+    # For a document's first quiz, the most recent questions generated for another
+    # upload of identical file bytes.
+    source = db.fetch_one(
+        """
+        SELECT q.id
+        FROM documents d
+        JOIN documents src ON src.content_hash = d.content_hash AND src.id != d.id
+        JOIN quizzes q ON q.document_id = src.id
+        WHERE d.id = ?
+          AND NOT EXISTS (SELECT 1 FROM quizzes own WHERE own.document_id = d.id)
+          AND EXISTS (SELECT 1 FROM questions qu WHERE qu.quiz_id = q.id)
+        ORDER BY q.created_at DESC
+        LIMIT 1
+        """,
+        (document_id,)
+    )
+    if not source:
+        return []
+
+    questions = db.fetch_all(
+        "SELECT question_text, correct_answer, option1, option2, option3 FROM questions WHERE quiz_id = ?",
+        (source[0],)
+    )
+    return [{
+        "question_text": q[0],
+        "correct_answer": q[1],
+        "option1": q[2],
+        "option2": q[3],
+        "option3": q[4]
+    } for q in questions]
+
+def insert_quiz_attempt(attempt_id: str, quiz_id: str, user_id: str, score: int, total_questions: int) -> bool:
+    # The attempt id is issued when the quiz starts, so saving the same attempt
+    # again is a no-op. Returns whether this call recorded it.
+    percentage = score * 100.0 / total_questions if total_questions else 0.0
+    with metrics.timer("db_write", table="quiz_attempts"), db.transaction() as conn:
+        inserted = conn.execute(
+            """INSERT INTO quiz_attempts (id, quiz_id, user_id, score, total_questions) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (id) DO NOTHING""",
+            (attempt_id, quiz_id, user_id, score, total_questions)
+        ).rowcount
+        if inserted:
+            _record_progress(conn, user_id, score, total_questions, percentage)
+    return bool(inserted)
+
+def _record_progress(conn: sqlite3.Connection, user_id: str, score: int, total_questions: int, percentage: float):
+    # Keep the rollups in step with quiz_attempts so progress reads never scan it.
+    conn.execute(
+        """
+        INSERT INTO user_progress (user_id, total_attempts, total_correct, total_questions, score_sum)
+        VALUES (?, 1, ?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_attempts = total_attempts + 1,
+            total_correct = total_correct + excluded.total_correct,
+            total_questions = total_questions + excluded.total_questions,
+            score_sum = score_sum + excluded.score_sum,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (user_id, score, total_questions, percentage)
+    )
+    conn.execute(
+        """
+        INSERT INTO user_progress_daily (user_id, day, attempts, total_correct, total_questions, score_sum)
+        VALUES (?, date('now'), 1, ?, ?, ?)
+        ON CONFLICT (user_id, day) DO UPDATE SET
+            attempts = attempts + 1,
+            total_correct = total_correct + excluded.total_correct,
+            total_questions = total_questions + excluded.total_questions,
+            score_sum = score_sum + excluded.score_sum
+        """,
+        (user_id, score, total_questions, percentage)
+    )
+
+def get_user_quizzes(user_id: str) -> List[Dict]:
+    quizzes = db.fetch_all(
+        """
+        SELECT q.id, q.title, q.created_at, d.title AS document_title
+        FROM quizzes q
+        JOIN documents d ON q.document_id = d.id
+        WHERE q.user_id = ?
+        ORDER BY q.created_at DESC
+        """,
+        (user_id,)
+    )
+    return [{"id": q[0], "title": q[1], "created_at": q[2], "document_title": q[3]} for q in quizzes]
+
+
+# Progress
+def get_user_progress(user_id: str, with_history: bool = False) -> Dict:
+    # Reads the incrementally maintained rollups; `history` holds one point per
+    # day (average score that day) and is only loaded for the progress chart.
+    with db.connection() as conn:
+        stats = conn.execute(
+            "SELECT total_attempts, total_correct, total_questions, score_sum FROM user_progress WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
+
+        days = []
+        if stats and with_history:
+            days = conn.execute(
+                """
+                SELECT day, attempts, score_sum / attempts
+                FROM user_progress_daily
+                WHERE user_id = ?
+                ORDER BY day
+                """,
+                (user_id,)
+            ).fetchall()
+
+    if stats and stats[0] > 0:
+        return {
+            "total_attempts": stats[0],
+            "total_correct": stats[1],
+            "total_questions": stats[2],
+            "average_score": round(stats[3] / stats[0], 2),
+            "history": [{"date": d[0], "attempts": d[1], "score": round(d[2], 2)} for d in days]
+        }
+
+    return {
+        "total_attempts": 0,
+        "total_correct": 0,
+        "total_questions": 0,
+        "average_score": 0,
+        "history": []
+    }
@@ -0,0 +1,94 @@
+import atexit
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from flashcard_core import db, metrics
+
+
+RESPONSE_BATCH_SIZE = int(os.getenv("FLASHCARD_RESPONSE_BATCH_SIZE", "50"))
+RESPONSE_FLUSH_INTERVAL = float(os.getenv("FLASHCARD_RESPONSE_FLUSH_INTERVAL", "5.0"))
+
+_INSERT = """
+INSERT OR IGNORE INTO question_responses
+    (attempt_id, quiz_id, question_id, user_id, answer, is_correct, answered_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ResponseWriter:
+    # Answers are buffered in memory and written in one executemany transaction
+    # when the batch fills up, on a timer, or when a caller needs them stored
+    # (e.g. before showing results). Rows are keyed on (attempt_id, question_id),
+    # so re-recording an answer is harmless.
+    def __init__(self, batch_size: int = RESPONSE_BATCH_SIZE, flush_interval: float = RESPONSE_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, attempt_id: str, quiz_id: str, question_id: str, user_id: str,
+               answer: Optional[str], is_correct: bool):
+        answered_at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        with self._lock:
+            self._buffer.append((attempt_id, quiz_id, question_id, user_id, answer, int(is_correct), answered_at))
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="response-writer", daemon=True)
+                self._thread.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        # Serialised so batches reach the database in the order they were taken.
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                with metrics.timer("db_write", table="question_responses"):
+                    db.executemany(_INSERT, rows)
+            except Exception:
+                with self._lock:
+                    self._buffer[:0] = rows
+                raise
+            return len(rows)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Keep the rows buffered and try again on the next tick.
+                pass
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+_writer: Optional[ResponseWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> ResponseWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ResponseWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+def record_response(attempt_id: str, quiz_id: str, question_id: str, user_id: str,
+                    answer: Optional[str], is_correct: bool):
+    get_writer().record(attempt_id, quiz_id, question_id, user_id, answer, is_correct)
+
+
+def flush_responses() -> int:
+    return get_writer().flush()
@@ -0,0 +1,97 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from flashcard_core import db
+
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+RELEARN_DELAY = float(os.getenv("FLASHCARD_RELEARN_DELAY", "600"))
+
+# Review buttons mapped onto SM-2 quality scores (0-5; below 3 is a lapse).
+GRADES = {"again": 1, "hard": 3, "good": 4, "easy": 5}
+
+
+def _timestamp(seconds: float) -> str:
+    # Same format as SQLite's CURRENT_TIMESTAMP so due dates compare as text.
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(seconds))
+
+
+def next_state(repetitions: int, interval_days: float, ease: float, quality: int) -> Tuple[int, float, float, float]:
+    # SM-2. Returns (repetitions, interval_days, ease, seconds until due).
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        return 0, 0.0, ease, RELEARN_DELAY
+
+    repetitions += 1
+    if repetitions == 1:
+        interval_days = 1.0
+    elif repetitions == 2:
+        interval_days = 6.0
+    else:
+        interval_days = round(interval_days * ease, 1)
+    return repetitions, interval_days, ease, interval_days * 86400
+
+
+def get_due_cards(user_id: str, limit: int, now: Optional[float] = None) -> List[Dict]:
+    cards = db.fetch_all(
+        """
+        SELECT f.id, f.front, f.back, s.repetitions, s.interval_days, s.ease, s.due_at
+        FROM card_states s
+        JOIN flashcards f ON f.id = s.flashcard_id
+        WHERE s.user_id = ? AND s.due_at <= ?
+        ORDER BY s.due_at
+        LIMIT ?
+        """,
+        (user_id, _timestamp(now or time.time()), limit)
+    )
+    return [{
+        "id": c[0],
+        "front": c[1],
+        "back": c[2],
+        "repetitions": c[3],
+        "interval_days": c[4],
+        "ease": c[5],
+        "due_at": c[6],
+    } for c in cards]
+
+
+def count_due_cards(user_id: str, now: Optional[float] = None) -> int:
+    row = db.fetch_one(
+        "SELECT COUNT(*) FROM card_states WHERE user_id = ? AND due_at <= ?",
+        (user_id, _timestamp(now or time.time()))
+    )
+    return row[0]
+
+
+def record_review(user_id: str, flashcard_id: str, grade: str, now: Optional[float] = None) -> Dict:
+    quality = GRADES[grade]
+    now = now or time.time()
+    with db.transaction() as conn:
+        row = conn.execute(
+            "SELECT repetitions, interval_days, ease FROM card_states WHERE user_id = ? AND flashcard_id = ?",
+            (user_id, flashcard_id)
+        ).fetchone()
+        repetitions, interval_days, ease = row or (0, 0.0, INITIAL_EASE)
+        repetitions, interval_days, ease, delay = next_state(repetitions, interval_days, ease, quality)
+        due_at = _timestamp(now + delay)
+
+        conn.execute(
+            """
+            INSERT INTO card_states
+                (user_id, flashcard_id, repetitions, interval_days, ease, due_at, reviews, lapses, last_reviewed_at)
+            VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT (user_id, flashcard_id) DO UPDATE SET
+                repetitions = excluded.repetitions,
+                interval_days = excluded.interval_days,
+                ease = excluded.ease,
+                due_at = excluded.due_at,
+                reviews = reviews + 1,
+                lapses = lapses + excluded.lapses,
+                last_reviewed_at = excluded.last_reviewed_at
+            """,
+            (user_id, flashcard_id, repetitions, interval_days, ease, due_at, int(quality < 3), _timestamp(now))
+        )
+
+    return {"repetitions": repetitions, "interval_days": interval_days, "ease": ease, "due_at": due_at}
@@ -0,0 +1,91 @@
+import re
+from typing import Dict, List
+
+from flashcard_core import db
+
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text: str) -> str:
+    # Quote every term so user input can't inject FTS syntax, and prefix-match
+    # the last one so results show up while the user is still typing.
+    terms = _TOKEN.findall(text)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(user_id: str, text: str, limit: int = 20) -> List[Dict]:
+    query = build_match_query(text)
+    if not query:
+        return []
+
+    rows = db.fetch_all(
+        """
+        SELECT kind, id, parent_id, title, snippet, rank FROM (
+            SELECT 'document' AS kind, d.id, d.id AS parent_id, d.title,
+                   '' AS snippet, MIN(hits.rank) AS rank
+            FROM (
+                SELECT documents_fts.rowid AS document_rowid, documents_fts.rank AS rank
+                FROM documents_fts
+                WHERE documents_fts MATCH :query
+
+                UNION ALL
+
+                SELECT dc.rowid, document_chunks_fts.rank
+                FROM document_chunks_fts
+                JOIN document_chunks c ON c.id = document_chunks_fts.rowid
+                JOIN documents dc ON dc.id = c.document_id
+                WHERE document_chunks_fts MATCH :query
+            ) hits
+            JOIN documents d ON d.rowid = hits.document_rowid
+            WHERE d.user_id = :user_id
+            GROUP BY d.id
+
+            UNION ALL
+
+            SELECT 'flashcard', f.id, f.document_id, f.front,
+                   snippet(flashcards_fts, 1, '**', '**', '…', 16), flashcards_fts.rank
+            FROM flashcards_fts
+            JOIN flashcards f ON f.rowid = flashcards_fts.rowid
+            JOIN documents d ON d.id = f.document_id
+            WHERE flashcards_fts MATCH :query AND d.user_id = :user_id
+
+            UNION ALL
+
+            SELECT 'question', qu.id, qu.quiz_id, qu.question_text,
+                   snippet(questions_fts, 1, '**', '**', '…', 16), questions_fts.rank
+            FROM questions_fts
+            JOIN questions qu ON qu.rowid = questions_fts.rowid
+            JOIN quizzes q ON q.id = qu.quiz_id
+            WHERE questions_fts MATCH :query AND q.user_id = :user_id
+        )
+        ORDER BY rank
+        LIMIT :limit
+        """,
+        {"query": query, "user_id": user_id, "limit": limit}
+    )
+    return [{
+        "kind": row[0],
+        "id": row[1],
+        "parent_id": row[2],
+        "title": row[3],
+        "snippet": row[4],
+        "score": -row[5],
+    } for row in rows]
+
+
+def rebuild_index():
+    # Search rows are keyed on the source tables' implicit rowids, which VACUUM
+    # may renumber; run this after a VACUUM, or after document_chunks was
+    # changed outside the app (chunk text is indexed by the repository).
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('delete-all')")
+        conn.execute("INSERT INTO documents_fts (rowid, title) SELECT rowid, title FROM documents")
+        conn.execute("INSERT INTO document_chunks_fts (document_chunks_fts) VALUES ('delete-all')")
+        conn.execute("INSERT INTO document_chunks_fts (rowid, body) SELECT id, decompress_text(content) FROM document_chunks")
+        conn.execute("INSERT INTO flashcards_fts (flashcards_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
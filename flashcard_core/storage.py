@@ -0,0 +1,57 @@
+import hashlib
+import os
+from typing import Callable, Optional, Tuple
+
+from flashcard_core import metrics
+from flashcard_core.extraction import extract_pages
+from flashcard_core.repository import (
+    copy_document, copy_flashcards_from_duplicate, find_document_by_hash, generate_id, get_document_content,
+    insert_document,
+)
+
+
+PDF_STORAGE_PATH = os.getenv("FLASHCARD_PDF_STORAGE_PATH", "uploaded_pdfs")
+
+
+def store_pdf(data: bytes) -> Tuple[str, str]:
+    # Files are content-addressed, so re-uploads of the same bytes share one copy.
+    content_hash = hashlib.sha256(data).hexdigest()
+    filepath = os.path.join(PDF_STORAGE_PATH, f"{content_hash}.pdf")
+    # Written to a temp file and renamed into place, so a crash or a concurrent
+    # upload of the same bytes never leaves a partial file under the hash; a
+    # size mismatch (a file truncated before this) is rewritten.
+    if not os.path.exists(filepath) or os.path.getsize(filepath) != len(data):
+        os.makedirs(PDF_STORAGE_PATH, exist_ok=True)
+        tmp_path = f"{filepath}.{generate_id()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    return content_hash, filepath
+
+
+def ingest_pdf(data: bytes, title: str, user_id: str,
+               progress: Optional[Callable[[int, int], None]] = None) -> Tuple[str, str]:
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    # The same user uploading the same file again gets their existing document
+    document_id = find_document_by_hash(content_hash, user_id)
+    if document_id:
+        metrics.count("uploads", result="own_duplicate")
+        return document_id, get_document_content(document_id)
+
+    # Anyone's earlier upload of these bytes already has the stored file and text
+    duplicate_id = find_document_by_hash(content_hash)
+    if duplicate_id:
+        document_id = copy_document(duplicate_id, user_id, title)
+        copy_flashcards_from_duplicate(document_id)
+        metrics.count("uploads", result="shared_duplicate")
+        return document_id, get_document_content(document_id)
+
+    _, filepath = store_pdf(data)
+
+    # Extract from the in-memory bytes rather than re-reading the file
+    pages = extract_pages(data, progress)
+    document_id = insert_document(user_id, title, filepath, pages, content_hash)
+    metrics.count("uploads", result="new")
+
+    return document_id, "".join(pages)
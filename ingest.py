@@ -0,0 +1,167 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from flashcard_core.bootstrap import bootstrap
+from flashcard_core.generation import generate_flashcards, generate_quiz
+from flashcard_core.repository import get_document_flashcards, get_user_id_by_username, is_flashcards_complete
+from flashcard_core.storage import ingest_pdf
+
+
+CHECKPOINT_FILE = ".ingest_checkpoint.jsonl"
+
+
+class Checkpoint:
+    # Append-only JSON lines keyed on owner and file content hash, so a rerun
+    # skips files already finished for that user even if they were renamed or
+    # moved within the directory.
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interrupted run
+                    if entry.get("status") == "done":
+                        self.done[(entry.get("user_id"), entry["hash"])] = entry
+
+    def record(self, entry: Dict):
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if entry["status"] == "done":
+                self.done[(entry["user_id"], entry["hash"])] = entry
+
+    def is_done(self, user_id: str, content_hash: str, with_quiz: bool) -> bool:
+        # A file finished without a quiz still needs one when --quiz is given.
+        entry = self.done.get((user_id, content_hash))
+        return entry is not None and (entry["quiz_id"] is not None or not with_quiz)
+
+
+def find_pdfs(directory: str, recursive: bool) -> List[str]:
+    if not recursive:
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.lower().endswith(".pdf"))
+    return sorted(os.path.join(root, name)
+                  for root, _, names in os.walk(directory)
+                  for name in names if name.lower().endswith(".pdf"))
+
+
+def process_file(path: str, data: bytes, content_hash: str, user_id: str, with_quiz: bool) -> Dict:
+    started = time.perf_counter()
+    title = os.path.basename(path)
+
+    document_id, content = ingest_pdf(data, title, user_id)
+    if not is_flashcards_complete(document_id):
+        generate_flashcards(document_id, content)
+    flashcards = get_document_flashcards(document_id)
+    if not flashcards:
+        raise RuntimeError("no flashcards were generated")
+
+    quiz_id = generate_quiz(document_id, user_id, content) if with_quiz else None
+
+    return {
+        "status": "done",
+        "user_id": user_id,
+        "hash": content_hash,
+        "path": path,
+        "document_id": document_id,
+        "flashcards": len(flashcards),
+        "quiz_id": quiz_id,
+        "bytes": len(data),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory of PDFs for a user")
+    parser.add_argument("directory")
+    parser.add_argument("--user", required=True, help="username that will own the documents")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--quiz", action="store_true", help="also generate a quiz for each document")
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--checkpoint", help=f"progress file (default: <directory>/{CHECKPOINT_FILE})")
+    args = parser.parse_args()
+
+    bootstrap()
+    user_id = get_user_id_by_username(args.user)
+    if not user_id:
+        sys.exit(f"Unknown user '{args.user}'")
+
+    checkpoint = Checkpoint(args.checkpoint or os.path.join(args.directory, CHECKPOINT_FILE))
+    paths = find_pdfs(args.directory, args.recursive)
+
+    # Copies of the same file are processed once: run concurrently, each would
+    # miss the other's document and generate everything twice.
+    pending, skipped, duplicates, seen = [], 0, 0, set()
+    for path in paths:
+        with open(path, "rb") as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        if checkpoint.is_done(user_id, content_hash, args.quiz):
+            skipped += 1
+        elif content_hash in seen:
+            duplicates += 1
+            checkpoint.record({"status": "skipped", "user_id": user_id, "hash": content_hash, "path": path,
+                               "reason": "duplicate"})
+        else:
+            seen.add(content_hash)
+            pending.append((path, content_hash))
+    skipped += duplicates
+    print(f"{len(paths)} PDFs found, {skipped - duplicates} already done, {duplicates} duplicates, "
+          f"{len(pending)} to process")
+
+    def run(path: str, content_hash: str) -> Dict:
+        # Files are read in the worker so only `workers` documents are held in memory.
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            return process_file(path, data, content_hash, user_id, args.quiz)
+        except Exception as e:
+            return {"status": "failed", "user_id": user_id, "hash": content_hash, "path": path, "error": str(e),
+                    "bytes": len(data)}
+
+    started = time.perf_counter()
+    done = failed = flashcards = quizzes = total_bytes = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(run, path, content_hash) for path, content_hash in pending]
+        for index, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            checkpoint.record(entry)
+            total_bytes += entry["bytes"]
+            if entry["status"] == "done":
+                done += 1
+                flashcards += entry["flashcards"]
+                quizzes += entry["quiz_id"] is not None
+                print(f"[{index}/{len(pending)}] {entry['path']}: {entry['flashcards']} flashcards "
+                      f"in {entry['seconds']:.1f}s")
+            else:
+                failed += 1
+                print(f"[{index}/{len(pending)}] {entry['path']}: FAILED {entry['error']}", file=sys.stderr)
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"\nProcessed {done + failed} files in {elapsed:.1f}s: {done} done, {failed} failed, {skipped} skipped\n"
+        f"{flashcards} flashcards, {quizzes} quizzes\n"
+        f"{(done + failed) / elapsed * 60:.1f} files/min, {total_bytes / elapsed / 1e6:.2f} MB/s"
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
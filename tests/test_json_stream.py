@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flashcard_core.json_stream import FLASHCARD_FIELDS, QUESTION_FIELDS, JsonObjectStream, parse_objects
+
+
+def feed_in_pieces(text: str, size: int):
+    stream = JsonObjectStream(FLASHCARD_FIELDS)
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(stream.feed(text[i:i + size]))
+    return items + stream.close(), stream.rejected
+
+
+def test_fenced_output_with_surrounding_prose():
+    text = 'Here are your cards:\n```json\n[{"front": "A", "back": "B"}, {"front": "C", "back": "D"}]\n```\nEnjoy!'
+    assert parse_objects(text, FLASHCARD_FIELDS) == ([{"front": "A", "back": "B"}, {"front": "C", "back": "D"}], 0)
+
+
+def test_prose_containing_an_open_brace():
+    text = 'I think { this is useful:\n[{"front": "A", "back": "B"}, {"front": "C", "back": "D"}]'
+    items, _ = parse_objects(text, FLASHCARD_FIELDS)
+    assert items == [{"front": "A", "back": "B"}, {"front": "C", "back": "D"}]
+
+
+def test_braces_and_escaped_quotes_inside_strings_split_across_pieces():
+    text = r'[{"front": "Set {x}", "back": "Say \"hi\" } then \\"}, {"front": "C", "back": "D"}]'
+    expected = [{"front": "Set {x}", "back": 'Say "hi" } then \\'}, {"front": "C", "back": "D"}]
+    for size in (1, 2, 3, 7, len(text)):
+        assert feed_in_pieces(text, size) == (expected, 0)
+
+
+def test_truncated_tail_keeps_complete_objects():
+    text = '[{"front": "A", "back": "B"}, {"front": "C", "back": "D"}, {"front": "E", "ba'
+    items, rejected = parse_objects(text, FLASHCARD_FIELDS)
+    assert items == [{"front": "A", "back": "B"}, {"front": "C", "back": "D"}]
+    assert rejected == 1
+
+
+def test_wrapper_object_is_unwrapped():
+    text = '{"flashcards": [{"front": "A", "back": "B"}, {"front": "", "back": "empty front"}]}'
+    assert parse_objects(text, FLASHCARD_FIELDS) == ([{"front": "A", "back": "B"}], 1)
+
+
+def test_trailing_commas_are_tolerated():
+    text = '[{"front": "A", "back": "B",}, {"front": "C", "back": "D",},]'
+    assert parse_objects(text, FLASHCARD_FIELDS) == ([{"front": "A", "back": "B"}, {"front": "C", "back": "D"}], 0)
+
+
+def test_invalid_objects_are_rejected_and_numbers_kept_as_text():
+    text = '[{"front": 1, "back": 2.5}, {"front": null, "back": "x"}, {"front": "  A ", "back": " B "}]'
+    assert parse_objects(text, FLASHCARD_FIELDS) == (
+        [{"front": "1", "back": "2.5"}, {"front": "A", "back": "B"}], 1
+    )
+
+
+def test_questions_require_every_field():
+    complete = '{"question_text": "Q?", "correct_answer": "A", "option1": "B", "option2": "C", "option3": "D"}'
+    missing = '{"question_text": "Q?", "correct_answer": "A", "option1": "B", "option2": "C"}'
+    items, rejected = parse_objects(f"[{complete}, {missing}]", QUESTION_FIELDS)
+    assert len(items) == 1 and rejected == 1
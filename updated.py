@@ -1,479 +1,52 @@
 import streamlit as st
-import sqlite3
 import os
-import hashlib
-import uuid
-import datetime
-import PyPDF2
-import io
-import json
-import pandas as pd
 import time
-import plotly.express as px
 import random
-import google.generativeai as genai
-from typing import List, Dict, Tuple, Any, Optional
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from contextlib import closing
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
 load_dotenv()
 
+from flashcard_core import metrics
+# Importing the handlers registers them with the job queue.
+from flashcard_core import handlers  # noqa: F401
+from flashcard_core.bootstrap import bootstrap
+from flashcard_core.export import get_flashcards_pdf
+from flashcard_core.generation import stream_flashcards
+from flashcard_core.jobs import (
+    start_worker_threads, get_job, get_user_jobs, JOB_POLL_INTERVAL,
+    enqueue as enqueue_job, cancel as cancel_job,
+    QUEUED as JOB_QUEUED, RUNNING as JOB_RUNNING, DONE as JOB_DONE, FAILED as JOB_FAILED, CANCELLED as JOB_CANCELLED,
+)
+from flashcard_core.llm_cache import get_cache
+from flashcard_core.repository import (
+    generate_id, register_user, authenticate_user,
+    get_user_documents, get_document_content, get_document_chunk_count, get_document_chunks,
+    get_document_title, get_document_flashcards, get_flashcards_page, get_quiz_questions, get_question_accuracy,
+    insert_quiz_attempt, get_user_quizzes, get_user_progress, is_flashcards_complete,
+)
+from flashcard_core.responses import record_response, flush_responses
+from flashcard_core.scheduler import get_due_cards, count_due_cards, record_review
+from flashcard_core.search import search
+from flashcard_core.storage import store_pdf
 
 
-DATABASE_FILE = "flashcard_app.db"
-PDF_STORAGE_PATH = "uploaded_pdfs"
 SESSION_TIMEOUT = 3600  
+FLASHCARDS_PAGE_SIZE = 5
+FLASHCARDS_PREVIEW_CARDS = 10
+REVIEW_BATCH_SIZE = 20
+SEARCH_RESULTS_LIMIT = 30
+EMBEDDED_JOB_WORKERS = int(os.getenv("EMBEDDED_JOB_WORKERS", "2"))
+METRICS_PORT = int(os.getenv("FLASHCARD_METRICS_PORT", "0"))
+ADMIN_USERS = {name.strip() for name in os.getenv("FLASHCARD_ADMIN_USERS", "").split(",") if name.strip()}
+RECENT_REQUESTS = 20
 
 
-if not os.path.exists(PDF_STORAGE_PATH):
-    os.makedirs(PDF_STORAGE_PATH)
+@st.cache_resource
+def init_db() -> Dict:
+    # Runs once per server process; a failure is not cached so the next rerun retries.
+    return bootstrap()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-genai.configure(api_key=GEMINI_API_KEY)
-gemini_model = genai.GenerativeModel('models/gemini-1.5-flash')
-
-
-def init_db():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-   
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id TEXT PRIMARY KEY,
-        username TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS documents (
-        id TEXT PRIMARY KEY,
-        user_id TEXT NOT NULL,
-        title TEXT NOT NULL,
-        filepath TEXT NOT NULL,
-        content TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    ''')
-    
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS flashcards (
-        id TEXT PRIMARY KEY,
-        document_id TEXT NOT NULL,
-        front TEXT NOT NULL,
-        back TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (document_id) REFERENCES documents (id)
-    )
-    ''')
-    
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS quizzes (
-        id TEXT PRIMARY KEY,
-        document_id TEXT NOT NULL,
-        user_id TEXT NOT NULL,
-        title TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (document_id) REFERENCES documents (id),
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    ''')
-    
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS questions (
-        id TEXT PRIMARY KEY,
-        quiz_id TEXT NOT NULL,
-        question_text TEXT NOT NULL,
-        correct_answer TEXT NOT NULL,
-        option1 TEXT NOT NULL,
-        option2 TEXT NOT NULL,
-        option3 TEXT NOT NULL,
-        FOREIGN KEY (quiz_id) REFERENCES quizzes (id)
-    )
-    ''')
-    
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS quiz_attempts (
-        id TEXT PRIMARY KEY,
-        quiz_id TEXT NOT NULL,
-        user_id TEXT NOT NULL,
-        score INTEGER NOT NULL,
-        total_questions INTEGER NOT NULL,
-        completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (quiz_id) REFERENCES quizzes (id),
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
-
-
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def generate_id() -> str:
-    return str(uuid.uuid4())
-
-
-def register_user(username: str, password: str, email: str) -> bool:
-    try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        user_id = generate_id()
-        password_hash = hash_password(password)
-        
-        cursor.execute(
-            "INSERT INTO users (id, username, password_hash, email) VALUES (?, ?, ?, ?)",
-            (user_id, username, password_hash, email)
-        )
-        conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
-
-def authenticate_user(username: str, password: str) -> Optional[str]:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT id, password_hash FROM users WHERE username = ?", 
-        (username,)
-    )
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result and result[1] == hash_password(password):
-        return result[0]  
-    return None
-
-def get_username_by_id(user_id: str) -> str:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT username FROM users WHERE id = ?", (user_id,))
-    result = cursor.fetchone()
-    conn.close()
-    
-    return result[0] if result else ""
-
-
-def save_uploaded_pdf(uploaded_file, user_id: str) -> Tuple[bool, str, str]:
-    try:
-        
-        file_id = generate_id()
-        filename = f"{file_id}_{uploaded_file.name}"
-        filepath = os.path.join(PDF_STORAGE_PATH, filename)
-        
-        
-        with open(filepath, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        
-        text_content = ""
-        with open(filepath, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text_content += page.extract_text()
-        
-        
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        document_id = generate_id()
-        
-        cursor.execute(
-            "INSERT INTO documents (id, user_id, title, filepath, content) VALUES (?, ?, ?, ?, ?)",
-            (document_id, user_id, uploaded_file.name, filepath, text_content)
-        )
-        conn.commit()
-        conn.close()
-        
-        return True, document_id, text_content
-    except Exception as e:
-        st.error(f"Error processing PDF: {str(e)}")
-        return False, "", ""
-
-def get_user_documents(user_id: str) -> List[Dict]:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT id, title, created_at FROM documents WHERE user_id = ? ORDER BY created_at DESC", 
-        (user_id,)
-    )
-    documents = cursor.fetchall()
-    conn.close()
-    
-    return [{"id": doc[0], "title": doc[1], "created_at": doc[2]} for doc in documents]
-
-def get_document_content(document_id: str) -> str:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT content FROM documents WHERE id = ?", (document_id,))
-    result = cursor.fetchone()
-    conn.close()
-    
-    return result[0] if result else ""
-
-def get_document_title(document_id: str) -> str:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT title FROM documents WHERE id = ?", (document_id,))
-    result = cursor.fetchone()
-    conn.close()
-    
-    return result[0] if result else ""
-
-# Flashcard functions
-def generate_flashcards(document_id: str, text_content: str) -> List[Dict]:
-    try:
-        
-        prompt = f"""
-        Create 10 flashcards from the following text. Each flashcard should be comprehensive and include at least 33% of the original content's key points.
-
-        For each flashcard:
-        1. The 'front' should be a key concept, term, or question
-        2. The 'back' must be detailed and thorough, covering at least 33% of the relevant information from the source text
-        3. Include examples, context, and explanations where appropriate
-        4. Make sure the explanations are substantive and not oversimplified
-
-        Format the result as a JSON array of objects, each with 'front' and 'back' properties.
-        
-        Text:
-        {text_content[:7000]}  # Limiting to avoid token limits
-        
-        Response format:
-        [
-            {{"front": "Concept/Question", "back": "Detailed explanation that covers at least 33% of the relevant information from the source text"}},
-            ...
-        ]
-        """
-        
-        
-        response = gemini_model.generate_content(prompt)
-        response_text = response.text
-        
-        
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].split("```")[0].strip()
-        else:
-            json_text = response_text
-        
-        flashcards = json.loads(json_text)
-        
-        
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        
-        for card in flashcards:
-            flashcard_id = generate_id()
-            cursor.execute(
-                "INSERT INTO flashcards (id, document_id, front, back) VALUES (?, ?, ?, ?)",
-                (flashcard_id, document_id, card["front"], card["back"])
-            )
-        
-        conn.commit()
-        conn.close()
-        
-        return flashcards
-    except Exception as e:
-        st.error(f"Error generating flashcards: {str(e)}")
-        return []
-
-def get_document_flashcards(document_id: str) -> List[Dict]:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT id, front, back FROM flashcards WHERE document_id = ?",
-        (document_id,)
-    )
-    flashcards = cursor.fetchall()
-    conn.close()
-    
-    return [{"id": card[0], "front": card[1], "back": card[2]} for card in flashcards]
-
-
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-import io
-
-def generate_flashcards_pdf(flashcards: list, document_title: str) -> bytes:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                            leftMargin=50, rightMargin=50, topMargin=50, bottomMargin=30)
-    styles = getSampleStyleSheet()
-
-    
-    title_style = ParagraphStyle('TitleStyle', parent=styles['Title'], fontSize=20, textColor=colors.darkblue, alignment=1, spaceAfter=15)
-    flashcard_title_style = ParagraphStyle('FlashcardTitleStyle', parent=styles['Heading2'], fontSize=16, spaceAfter=10, textColor=colors.white, backColor=colors.darkred, alignment=1, leading=20)
-    flashcard_front_style = ParagraphStyle('FrontStyle', parent=styles['Normal'], fontSize=14, leading=18, spaceAfter=5, textColor=colors.black, alignment=4)  # **Justified**
-    flashcard_back_style = ParagraphStyle('BackStyle', parent=styles['Normal'], fontSize=12, leading=16, textColor=colors.darkblue, spaceAfter=10, alignment=4)  # **Justified**
-
-    elements = []
-
-    
-    elements.append(Paragraph(f"{document_title}", title_style))
-    elements.append(Spacer(1, 0.3 * inch))
-
-    
-    table_data = []
-    for i, card in enumerate(flashcards):
-        flashcard_title = Paragraph(f"<b>Flashcard {i+1}</b>", flashcard_title_style)
-        front_side = Paragraph(f"<b>{card['front']}</b>", flashcard_front_style)
-        back_side = Paragraph(f"{card['back']}", flashcard_back_style)
-
-        
-        table_data.append([flashcard_title])
-        table_data.append([front_side])
-        table_data.append([back_side])
-        table_data.append([Spacer(1, 0.3 * inch)])  # Space between flashcards
-
-    # **Apply Table Styling**
-    table = Table(table_data, colWidths=[6.5 * inch])  # Adjust width to center text
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),  # Center everything
-        ('LEFTPADDING', (0, 0), (-1, -1), 10),  # Ensure proper padding
-        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),  # Title background
-    ]))
-
-    elements.append(table)
-
-    
-    doc.build(elements)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    
-    return pdf_bytes
-
-
-
-
-def generate_quiz(document_id: str, user_id: str, document_content: str) -> Optional[str]:
-    try:
-        # First check if we have flashcards for this document
-        flashcards = get_document_flashcards(document_id)
-        
-        # If no flashcards exist, generate some
-        if not flashcards:
-            flashcards = generate_flashcards(document_id, document_content)
-            if not flashcards:
-                return None
-        
-        # Create quiz in database
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        
-        quiz_id = generate_id()
-        doc_title = get_document_title(document_id)
-        quiz_title = f"Quiz on {doc_title}"
-        
-        cursor.execute(
-            "INSERT INTO quizzes (id, document_id, user_id, title) VALUES (?, ?, ?, ?)",
-            (quiz_id, document_id, user_id, quiz_title)
-        )
-        
-        # Prepare the prompt for Gemini to create MCQs from flashcards
-        flashcard_text = "\n".join([f"Topic: {card['front']}\nExplanation: {card['back']}" for card in flashcards])
-        
-        prompt = f"""
-        Create 10 multiple-choice questions based on these flashcard topics:
-        
-        {flashcard_text}
-        
-        Format the result as a JSON array of objects, each with 'question_text', 'correct_answer', 'option1', 'option2', and 'option3' properties.
-        The 'correct_answer' should be the right answer, and options should be plausible but incorrect alternatives.
-        
-        Response format:
-        [
-            {{
-                "question_text": "Question goes here?",
-                "correct_answer": "Correct answer",
-                "option1": "Wrong option 1",
-                "option2": "Wrong option 2",
-                "option3": "Wrong option 3"
-            }},
-            ...
-        ]
-        """
-        
-        # Generate questions using Gemini API
-        response = gemini_model.generate_content(prompt)
-        response_text = response.text
-        
-        # Extract JSON from the response
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].split("```")[0].strip()
-        else:
-            json_text = response_text
-        
-        questions = json.loads(json_text)
-        
-        # Store questions in the database
-        for question in questions:
-            question_id = generate_id()
-            cursor.execute(
-                """INSERT INTO questions 
-                   (id, quiz_id, question_text, correct_answer, option1, option2, option3) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (question_id, quiz_id, question["question_text"], question["correct_answer"], 
-                 question["option1"], question["option2"], question["option3"])
-            )
-        
-        conn.commit()
-        conn.close()
-        
-        return quiz_id
-    except Exception as e:
-        st.error(f"Error generating quiz: {str(e)}")
-        return None
-
-def get_quiz_questions(quiz_id: str) -> List[Dict]:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT id, question_text, correct_answer, option1, option2, option3 FROM questions WHERE quiz_id = ?",
-        (quiz_id,)
-    )
-    questions = cursor.fetchall()
-    conn.close()
-    
-    return [{
-        "id": q[0],
-        "question_text": q[1],
-        "correct_answer": q[2],
-        "options": [q[2], q[3], q[4], q[5]]  # Correct answer + wrong options
-    } for q in questions]
 
 def shuffle_options(questions: List[Dict]) -> List[Dict]:
     # Shuffle the options for each question and track the correct answer
@@ -493,97 +66,79 @@ def shuffle_options(questions: List[Dict]) -> List[Dict]:
     
     return shuffled_questions
 
-def save_quiz_result(quiz_id: str, user_id: str, score: int, total_questions: int) -> bool:
+def save_quiz_result(attempt_id: str, quiz_id: str, user_id: str, score: int, total_questions: int) -> bool:
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        
-        attempt_id = generate_id()
-        cursor.execute(
-            "INSERT INTO quiz_attempts (id, quiz_id, user_id, score, total_questions) VALUES (?, ?, ?, ?, ?)",
-            (attempt_id, quiz_id, user_id, score, total_questions)
-        )
-        
-        conn.commit()
-        conn.close()
+        # Store this attempt's buffered answers along with its score.
+        flush_responses()
+        insert_quiz_attempt(attempt_id, quiz_id, user_id, score, total_questions)
         return True
     except Exception as e:
         st.error(f"Error saving quiz result: {str(e)}")
         return False
 
-def get_user_quizzes(user_id: str) -> List[Dict]:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        """
-        SELECT q.id, q.title, q.created_at, d.title AS document_title
-        FROM quizzes q
-        JOIN documents d ON q.document_id = d.id
-        WHERE q.user_id = ?
-        ORDER BY q.created_at DESC
-        """, 
-        (user_id,)
-    )
-    quizzes = cursor.fetchall()
-    conn.close()
-    
-    return [{"id": q[0], "title": q[1], "created_at": q[2], "document_title": q[3]} for q in quizzes]
+# Background jobs
+@st.cache_resource
+def start_job_workers():
+    # In-process workers so a single `streamlit run` works on its own; set
+    # EMBEDDED_JOB_WORKERS=0 when running worker.py as a separate pool.
+    return start_worker_threads(EMBEDDED_JOB_WORKERS)
+
+@st.cache_resource
+def start_metrics_server():
+    # Prometheus scrape endpoint at :FLASHCARD_METRICS_PORT/metrics, off by default.
+    return metrics.start_http_server(METRICS_PORT) if METRICS_PORT else None
+
+class JobPending(BaseException):
+    # Raised by poll_job to end the rerun; main() waits and reruns outside the
+    # render_page timer, so the poll interval is not counted as render time.
+    pass
+
+def poll_job(job_id: str, render_running: Optional[Callable[[Dict], None]] = None) -> Optional[Dict]:
+    # Returns the job once it has finished; until then shows its progress (and
+    # any partial output via `render_running`) and reruns the page.
+    job = get_job(job_id)
+    if job is None or job["status"] in (JOB_DONE, JOB_FAILED, JOB_CANCELLED):
+        return job
+    
+    st.progress(job["progress"], text=job["message"] or "Waiting for a worker...")
+    if render_running:
+        render_running(job)
+    raise JobPending()
+
+def cancel_upload_job():
+    # Cancel button and logout only; navigating away leaves the job running.
+    # Generation stops at the worker's next progress report, keeping the cards
+    # stored so far, and can be resumed from the document page.
+    if st.session_state.get("upload_job"):
+        cancel_job(st.session_state.upload_job)
+        st.session_state.upload_job = None
+
+def is_uploading(document_id: str) -> bool:
+    # Whether this session's upload job is still generating cards for the document.
+    job = get_job(st.session_state.upload_job) if st.session_state.upload_job else None
+    return bool(job and job["status"] in (JOB_QUEUED, JOB_RUNNING) and job["result"]
+                and job["result"].get("document_id") == document_id)
+
+def render_flashcard_list(flashcards: List[Dict]):
+    for i, card in enumerate(flashcards):
+        with st.expander(f"Flashcard {i+1}: {card['front']}"):
+            st.write(card['back'])
 
-def get_user_progress(user_id: str) -> Dict:
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    # Get quiz attempt statistics
-    cursor.execute(
-        """
-        SELECT 
-            COUNT(*) AS total_attempts,
-            SUM(score) AS total_correct,
-            SUM(total_questions) AS total_questions,
-            AVG(CAST(score AS FLOAT) / total_questions) * 100 AS average_score
-        FROM quiz_attempts
-        WHERE user_id = ?
-        """, 
-        (user_id,)
-    )
-    stats = cursor.fetchone()
-    
-    # Get attempts over time
-    cursor.execute(
-        """
-        SELECT 
-            completed_at,
-            CAST(score AS FLOAT) / total_questions * 100 AS percentage
-        FROM quiz_attempts
-        WHERE user_id = ?
-        ORDER BY completed_at
-        """, 
-        (user_id,)
-    )
-    attempts = cursor.fetchall()
-    
-    conn.close()
-    
-    # Prepare progress data
-    if stats[0] > 0:  # If there are any attempts
-        progress_data = {
-            "total_attempts": stats[0],
-            "total_correct": stats[1],
-            "total_questions": stats[2],
-            "average_score": round(stats[3], 2) if stats[3] else 0,
-            "attempts": [{"date": a[0], "score": round(a[1], 2)} for a in attempts]
-        }
+def start_quiz_generation(document_id: str):
+    st.session_state.quiz_job = enqueue_job("generate_quiz", st.session_state.user_id, {"document_id": document_id})
+    st.rerun()
+
+def render_quiz_job_status():
+    if not st.session_state.quiz_job:
+        return
+    
+    job = poll_job(st.session_state.quiz_job)
+    st.session_state.quiz_job = None
+    if job and job["status"] == JOB_DONE:
+        start_quiz_attempt(job["result"]["quiz_id"])
+        st.rerun()
     else:
-        progress_data = {
-            "total_attempts": 0,
-            "total_correct": 0,
-            "total_questions": 0,
-            "average_score": 0,
-            "attempts": []
-        }
-    
-    return progress_data
+        st.error(f"Failed to generate quiz. {job['error'] if job else ''}")
 
 # Session management
 def init_session_state():
@@ -609,6 +164,20 @@ def init_session_state():
         st.session_state.quiz_completed = False
     if 'quiz_score' not in st.session_state:
         st.session_state.quiz_score = 0
+    if 'quiz_attempt_id' not in st.session_state:
+        st.session_state.quiz_attempt_id = None
+    if 'upload_job' not in st.session_state:
+        st.session_state.upload_job = None
+    if 'quiz_job' not in st.session_state:
+        st.session_state.quiz_job = None
+    if 'pdf_exports' not in st.session_state:
+        st.session_state.pdf_exports = set()
+    if 'flashcards_page_cursors' not in st.session_state:
+        st.session_state.flashcards_page_cursors = [None]
+    if 'review_queue' not in st.session_state:
+        st.session_state.review_queue = []
+    if 'review_revealed' not in st.session_state:
+        st.session_state.review_revealed = False
 
 def check_session_validity():
     if st.session_state.login_time:
@@ -627,6 +196,7 @@ def login_user(user_id: str, username: str):
     st.session_state.active_page = "dashboard"
 
 def logout_user():
+    cancel_upload_job()
     st.session_state.user_id = None
     st.session_state.username = None
     st.session_state.login_time = None
@@ -638,8 +208,44 @@ def logout_user():
     st.session_state.user_answers = {}
     st.session_state.quiz_completed = False
     st.session_state.quiz_score = 0
+    st.session_state.quiz_attempt_id = None
+    st.session_state.upload_job = None
+    st.session_state.quiz_job = None
+    st.session_state.pdf_exports = set()
+    st.session_state.flashcards_page_cursors = [None]
+    st.session_state.review_queue = []
+    st.session_state.review_revealed = False
+
+def start_quiz_attempt(quiz_id: str):
+    # Each run through a quiz gets its own attempt id; the result is saved
+    # under it exactly once, however often the results screen reruns.
+    st.session_state.active_page = "take_quiz"
+    st.session_state.active_quiz = quiz_id
+    st.session_state.quiz_questions = None
+    st.session_state.current_question = 0
+    st.session_state.user_answers = {}
+    st.session_state.quiz_completed = False
+    st.session_state.quiz_score = 0
+    st.session_state.quiz_attempt_id = generate_id()
 
 # UI Components
+def render_pdf_download(document_id: str, document_title: str):
+    # The PDF is only built once the user asks for it, not on every render.
+    requested = st.session_state.pdf_exports
+    if document_id not in requested:
+        if st.button("Export Flashcards as PDF", key=f"export_{document_id}"):
+            requested.add(document_id)
+            st.rerun()
+        return
+    
+    st.download_button(
+        label="Download Flashcards as PDF",
+        data=get_flashcards_pdf(document_id),
+        file_name=f"flashcards_{document_title.replace(' ', '_')}.pdf",
+        mime="application/pdf",
+        key=f"download_{document_id}",
+    )
+
 def render_login_page():
     st.title("AI Flashcard & Quiz System")
     
@@ -701,6 +307,13 @@ def render_sidebar():
     
     if st.sidebar.button("My Flashcards"):
         st.session_state.active_page = "flashcards"
+        st.session_state.flashcards_page_cursors = [None]
+        st.rerun()
+    
+    if st.sidebar.button("Review Flashcards"):
+        st.session_state.active_page = "review"
+        st.session_state.review_queue = []
+        st.session_state.review_revealed = False
         st.rerun()
     
     if st.sidebar.button("My Quizzes"):
@@ -711,6 +324,14 @@ def render_sidebar():
         st.session_state.active_page = "progress"
         st.rerun()
     
+    if st.sidebar.button("Search"):
+        st.session_state.active_page = "search"
+        st.rerun()
+    
+    if st.session_state.username in ADMIN_USERS and st.sidebar.button("Admin"):
+        st.session_state.active_page = "admin"
+        st.rerun()
+    
     # Logout button at the bottom
     st.sidebar.markdown("---")
     if st.sidebar.button("Logout"):
@@ -734,6 +355,13 @@ def render_dashboard():
     with col3:
         st.metric("Average Score", f"{progress['average_score']}%")
     
+    # Work still running in the background
+    active_jobs = [job for job in get_user_jobs(st.session_state.user_id) if job["status"] in (JOB_QUEUED, JOB_RUNNING)]
+    if active_jobs:
+        st.subheader("In Progress")
+        for job in active_jobs:
+            st.progress(job["progress"], text=f"{job['kind'].replace('_', ' ').capitalize()}: {job['message'] or 'Queued'}")
+    
     # Recent documents
     st.subheader("Your Recent Documents")
     documents = get_user_documents(st.session_state.user_id)
@@ -753,7 +381,7 @@ def render_dashboard():
     
     # Quick actions
     st.subheader("Quick Actions")
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         if st.button("Upload New Document"):
@@ -764,6 +392,13 @@ def render_dashboard():
         if st.button("Take a Quiz"):
             st.session_state.active_page = "quizzes"
             st.rerun()
+    
+    with col3:
+        if st.button("Review Flashcards"):
+            st.session_state.active_page = "review"
+            st.session_state.review_queue = []
+            st.session_state.review_revealed = False
+            st.rerun()
 
 def render_upload_page():
     st.title("Upload Document")
@@ -772,28 +407,36 @@ def render_upload_page():
     
     uploaded_file = st.file_uploader("Choose a PDF file", type=["pdf"])
     
-    if uploaded_file is not None:
+    if uploaded_file is not None and not st.session_state.upload_job:
         if st.button("Process Document"):
-            with st.spinner("Processing document..."):
-                success, document_id, content = save_uploaded_pdf(uploaded_file, st.session_state.user_id)
-                
-                if success:
-                    st.success("Document uploaded successfully!")
-                    
-                    # Generate flashcards
-                    with st.spinner("Generating flashcards..."):
-                        flashcards = generate_flashcards(document_id, content)
-                        if flashcards:
-                            st.success(f"Generated {len(flashcards)} flashcards!")
-                            
-                            # Set active document
-                            st.session_state.active_page = "document"
-                            st.session_state.active_document = document_id
-                            st.rerun()
-                        else:
-                            st.error("Failed to generate flashcards.")
-                else:
-                    st.error("Failed to upload document.")
+            _, filepath = store_pdf(uploaded_file.getvalue())
+            st.session_state.upload_job = enqueue_job(
+                "process_document", st.session_state.user_id,
+                {"filepath": filepath, "title": uploaded_file.name}
+            )
+            st.rerun()
+    
+    if st.session_state.upload_job:
+        if st.button("Cancel"):
+            cancel_upload_job()
+            st.rerun()
+        
+        job = poll_job(st.session_state.upload_job, render_upload_progress)
+        st.session_state.upload_job = None
+        if job and job["status"] == JOB_DONE:
+            st.success(f"Generated {job['result']['flashcards']} flashcards!")
+            
+            # Set active document
+            st.session_state.active_page = "document"
+            st.session_state.active_document = job["result"]["document_id"]
+            st.rerun()
+        else:
+            st.error(f"Failed to process document. {job['error'] if job else ''}")
+
+def render_upload_progress(job: Dict):
+    # Cards are stored as they are generated; show the ones done so far.
+    if job["result"] and job["result"].get("document_id"):
+        render_flashcard_list(get_document_flashcards(job["result"]["document_id"]))
 
 def render_document_page():
     if not st.session_state.active_document:
@@ -812,26 +455,32 @@ def render_document_page():
         flashcards = get_document_flashcards(document_id)
         
         if flashcards:
-            # Add download button for flashcards PDF
-            pdf_bytes = generate_flashcards_pdf(flashcards, document_title)
-            st.download_button(
-                label="Download Flashcards as PDF",
-                data=pdf_bytes,
-                file_name=f"flashcards_{document_title.replace(' ', '_')}.pdf",
-                mime="application/pdf",
-            )
+            render_pdf_download(document_id, document_title)
             
-            for i, card in enumerate(flashcards):
-                with st.expander(f"Flashcard {i+1}: {card['front']}"):
-                    st.write(card['back'])
+            render_flashcard_list(flashcards)
         else:
             st.info("No flashcards found for this document.")
-            
-            if st.button("Generate Flashcards"):
-                with st.spinner("Generating flashcards..."):
-                    content = get_document_content(document_id)
-                    new_flashcards = generate_flashcards(document_id, content)
-                    
+        
+        if not is_flashcards_complete(document_id):
+            if is_uploading(document_id):
+                st.info("Flashcards for this document are still being generated.")
+            elif st.button("Generate Remaining Flashcards" if flashcards else "Generate Flashcards"):
+                # Only the chunks without cards are generated. Cards are shown as
+                # they stream in; leaving the page stops the script, and closing
+                # the stream cancels the remaining requests.
+                progress = st.progress(0.0, text="Generating flashcards...")
+                new_flashcards = []
+                try:
+                    with closing(stream_flashcards(document_id, get_document_content(document_id))) as batches:
+                        for cards, done in batches:
+                            for card in cards:
+                                new_flashcards.append(card)
+                                with st.expander(f"Flashcard {len(flashcards) + len(new_flashcards)}: {card['front']}"):
+                                    st.write(card['back'])
+                            progress.progress(done, text=f"Generated {len(new_flashcards)} flashcards...")
+                except Exception as e:
+                    st.error(f"Error generating flashcards: {str(e)}")
+                else:
                     if new_flashcards:
                         st.success(f"Generated {len(new_flashcards)} flashcards!")
                         st.rerun()
@@ -841,52 +490,103 @@ def render_document_page():
     with tab2:
         st.subheader("Quiz")
         
-        if st.button("Generate New Quiz"):
-            with st.spinner("Creating quiz..."):
-                content = get_document_content(document_id)
-                quiz_id = generate_quiz(document_id, st.session_state.user_id, content)
-                
-                if quiz_id:
-                    st.session_state.active_page = "take_quiz"
-                    st.session_state.active_quiz = quiz_id
-                    st.rerun()
-                else:
-                    st.error("Failed to generate quiz.")
+        if not st.session_state.quiz_job and st.button("Generate New Quiz"):
+            start_quiz_generation(document_id)
+        
+        quiz_status = st.container()
     
     with tab3:
         st.subheader("Document Content")
-        content = get_document_content(document_id)
-        st.text_area("Document Text", content, height=400)
+        
+        # Only the page being viewed is loaded
+        page_count = get_document_chunk_count(document_id)
+        if page_count == 0:
+            st.info("No text was extracted from this document.")
+        else:
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"content_page_{document_id}")
+            st.text_area("Document Text", get_document_chunks(document_id, page - 1, 1)[0], height=400)
+            st.caption(f"Page {page} of {page_count}")
+    
+    # Polling sleeps and reruns the script, so it runs once every tab has rendered
+    with quiz_status:
+        render_quiz_job_status()
 
 def render_flashcards_page():
     st.title("My Flashcards")
     
-    documents = get_user_documents(st.session_state.user_id)
+    # Keyset cursors of the pages visited so far; the last one is the current page
+    cursors = st.session_state.flashcards_page_cursors
+    documents, next_cursor = get_flashcards_page(
+        st.session_state.user_id, FLASHCARDS_PAGE_SIZE, cursors[-1], FLASHCARDS_PREVIEW_CARDS
+    )
     
-    if not documents:
+    if not documents and len(cursors) == 1:
         st.info("You haven't uploaded any documents yet. Go to 'Upload Document' to get started!")
         return
     
     for doc in documents:
-        flashcards = get_document_flashcards(doc['id'])
+        st.subheader(f"📚 {doc['title']} ({doc['flashcard_count']} flashcards)")
         
-        if flashcards:
-            st.subheader(f"📚 {doc['title']} ({len(flashcards)} flashcards)")
-            
-            # Add download button for flashcards PDF
-            pdf_bytes = generate_flashcards_pdf(flashcards, doc['title'])
-            st.download_button(
-                label="Download Flashcards as PDF",
-                data=pdf_bytes,
-                file_name=f"flashcards_{doc['title'].replace(' ', '_')}.pdf",
-                mime="application/pdf",
-            )
-            
-            # Ensure `st.expander()` is not inside another `st.expander()` or improper container
-            for i, card in enumerate(flashcards):
-                expander = st.expander(f"Flashcard {i+1}: {card['front']}")
-                with expander:
-                    st.write(card['back'])
+        render_pdf_download(doc['id'], doc['title'])
+        
+        # Ensure `st.expander()` is not inside another `st.expander()` or improper container
+        for i, card in enumerate(doc['flashcards']):
+            expander = st.expander(f"Flashcard {i+1}: {card['front']}")
+            with expander:
+                st.write(card['back'])
+        
+        if doc['flashcard_count'] > len(doc['flashcards']):
+            if st.button(f"View all {doc['flashcard_count']} flashcards", key=f"all_{doc['id']}"):
+                st.session_state.active_page = "document"
+                st.session_state.active_document = doc['id']
+                st.rerun()
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if len(cursors) > 1 and st.button("Previous"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.write(f"Page {len(cursors)}")
+    with col3:
+        if next_cursor and st.button("Next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+def render_review_page():
+    st.title("Review Flashcards")
+    
+    # Due cards are fetched a batch at a time, in due order, straight off the index
+    queue = st.session_state.review_queue
+    if not queue:
+        queue.extend(get_due_cards(st.session_state.user_id, REVIEW_BATCH_SIZE))
+    
+    if not queue:
+        st.success("You're all caught up! No flashcards are due for review.")
+        return
+    
+    st.caption(f"{count_due_cards(st.session_state.user_id)} flashcards due")
+    
+    card = queue[0]
+    st.subheader(card["front"])
+    
+    if not st.session_state.review_revealed:
+        if st.button("Show Answer"):
+            st.session_state.review_revealed = True
+            st.rerun()
+        return
+    
+    st.write(card["back"])
+    st.markdown("---")
+    
+    grades = [("again", "Again"), ("hard", "Hard"), ("good", "Good"), ("easy", "Easy")]
+    for col, (grade, label) in zip(st.columns(len(grades)), grades):
+        with col:
+            if st.button(label, key=f"grade_{grade}"):
+                record_review(st.session_state.user_id, card["id"], grade)
+                queue.pop(0)
+                st.session_state.review_revealed = False
+                st.rerun()
 
 def render_quizzes_page():
     st.title("My Quizzes")
@@ -906,17 +606,10 @@ def render_quizzes_page():
                 with col1:
                     st.write(f"📚 {doc['title']}")
                 with col2:
-                    if st.button("Create Quiz", key=f"quiz_{doc['id']}"):
-                        with st.spinner("Creating quiz..."):
-                            content = get_document_content(doc['id'])
-                            quiz_id = generate_quiz(doc['id'], st.session_state.user_id, content)
-                            
-                            if quiz_id:
-                                st.session_state.active_page = "take_quiz"
-                                st.session_state.active_quiz = quiz_id
-                                st.rerun()
-                            else:
-                                st.error("Failed to generate quiz.")
+                    if not st.session_state.quiz_job and st.button("Create Quiz", key=f"quiz_{doc['id']}"):
+                        start_quiz_generation(doc['id'])
+            
+            render_quiz_job_status()
         else:
             st.info("You haven't uploaded any documents yet. Go to 'Upload Document' to get started!")
     else:
@@ -926,12 +619,7 @@ def render_quizzes_page():
                 st.write(f"📝 {quiz['title']} ({quiz['document_title']})")
             with col2:
                 if st.button("Take Quiz", key=f"take_{quiz['id']}"):
-                    st.session_state.active_page = "take_quiz"
-                    st.session_state.active_quiz = quiz['id']
-                    st.session_state.current_question = 0
-                    st.session_state.user_answers = {}
-                    st.session_state.quiz_completed = False
-                    st.session_state.quiz_score = 0
+                    start_quiz_attempt(quiz['id'])
                     st.rerun()
 
 def render_take_quiz_page():
@@ -962,8 +650,12 @@ def render_take_quiz_page():
         
         st.markdown(f"## Your Score: {score}/{total} ({percentage:.1f}%)")
         
-        # Save quiz result to database
-        save_quiz_result(quiz_id, st.session_state.user_id, score, total)
+        # Save quiz result to database, once per attempt
+        attempt_id = st.session_state.quiz_attempt_id
+        if attempt_id and save_quiz_result(attempt_id, quiz_id, st.session_state.user_id, score, total):
+            st.session_state.quiz_attempt_id = None
+        
+        accuracy = get_question_accuracy(quiz_id)
         
         # Show correct/incorrect answers
         for i, q in enumerate(questions):
@@ -981,6 +673,10 @@ def render_take_quiz_page():
                 if not correct:
                     st.write(f"Correct answer: {q['correct_answer']}")
                 
+                if q["id"] in accuracy:
+                    stats = accuracy[q["id"]]
+                    st.caption(f"Answered correctly {stats['accuracy']:.0f}% of the time ({stats['answers']} answers)")
+                
                 st.markdown("---")
         
         if st.button("Return to Quizzes"):
@@ -1012,11 +708,16 @@ def render_take_quiz_page():
                 if st.button("Submit Answer"):
                     # Save the answer
                     st.session_state.user_answers[current_q["id"]] = user_choice
+                    correct = user_choice == current_q["correct_answer"]
                     
                     # Check if correct
-                    if user_choice == current_q["correct_answer"]:
+                    if correct:
                         st.session_state.quiz_score += 1
                     
+                    if st.session_state.quiz_attempt_id:
+                        record_response(st.session_state.quiz_attempt_id, quiz_id, current_q["id"],
+                                        st.session_state.user_id, user_choice, correct)
+                    
                     # Move to next question
                     st.session_state.current_question += 1
                     
@@ -1037,7 +738,7 @@ def render_take_quiz_page():
 def render_progress_page():
     st.title("Progress Report")
     
-    progress = get_user_progress(st.session_state.user_id)
+    progress = get_user_progress(st.session_state.user_id, with_history=True)
     
     col1, col2, col3 = st.columns(3)
     
@@ -1051,9 +752,13 @@ def render_progress_page():
         st.metric("Average Score", f"{progress['average_score']}%")
     
     # Progress chart
-    if progress["attempts"]:
+    if progress["history"]:
+        # Plotting libraries are only needed here, so they load on first use
+        import pandas as pd
+        import plotly.express as px
+        
         # Convert data for chart
-        df = pd.DataFrame(progress["attempts"])
+        df = pd.DataFrame(progress["history"])
         df['date'] = pd.to_datetime(df['date'])
         
         # Create chart
@@ -1061,7 +766,7 @@ def render_progress_page():
             df, 
             x='date', 
             y='score', 
-            title='Quiz Scores Over Time',
+            title='Average Quiz Score per Day',
             labels={'date': 'Date', 'score': 'Score (%)'},
             markers=True
         )
@@ -1070,39 +775,130 @@ def render_progress_page():
     else:
         st.info("Take some quizzes to see your progress over time!")
 
+def render_search_page():
+    st.title("Search")
+    
+    query = st.text_input("Search your documents, flashcards and quizzes", key="search_query")
+    if not query:
+        return
+    
+    results = search(st.session_state.user_id, query, SEARCH_RESULTS_LIMIT)
+    if not results:
+        st.info("No matches found.")
+        return
+    
+    icons = {"document": "📚", "flashcard": "🗂️", "question": "📝"}
+    for result in results:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.write(f"{icons[result['kind']]} **{result['title']}**")
+            if result['snippet']:
+                st.caption(result['snippet'])
+        with col2:
+            if result['kind'] == "question":
+                if st.button("Take Quiz", key=f"search_{result['id']}"):
+                    start_quiz_attempt(result['parent_id'])
+                    st.rerun()
+            elif st.button("Open", key=f"search_{result['id']}"):
+                st.session_state.active_page = "document"
+                st.session_state.active_document = result['parent_id']
+                st.rerun()
+
+def render_admin_page():
+    if st.session_state.username not in ADMIN_USERS:
+        st.error("You don't have access to this page")
+        return
+    
+    st.title("Admin: Metrics")
+    st.caption("Figures cover this server process only; worker.py processes expose their own.")
+    
+    st.subheader("Stage Latency")
+    summary = metrics.stage_summary()
+    if summary:
+        st.dataframe(summary, use_container_width=True)
+    else:
+        st.info("Nothing has been measured yet.")
+    
+    st.subheader("LLM Response Cache")
+    stats = get_cache().stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Hit Rate", f"{stats['hit_rate'] * 100:.1f}%")
+    with col2:
+        st.metric("Entries", stats["entries"])
+    with col3:
+        st.metric("Size", f"{stats['bytes'] / 1e6:.1f} MB")
+    
+    st.subheader("Recent Requests")
+    by_request = {}
+    for span in reversed(metrics.recent_spans()):
+        if span["request_id"] and (span["request_id"] in by_request or len(by_request) < RECENT_REQUESTS):
+            by_request.setdefault(span["request_id"], []).append(span)
+    for request_id, spans in by_request.items():
+        total = max(span["seconds"] for span in spans)
+        with st.expander(f"{request_id[:12]} ({total:.2f}s, {len(spans)} spans)"):
+            for span in sorted(spans, key=lambda span: span["started_at"]):
+                labels = ", ".join(f"{key}={value}" for key, value in span["labels"].items())
+                error = f" ❌ {span['error']}" if span["error"] else ""
+                st.write(f"`{span['stage']}` {labels} {span['seconds'] * 1000:.1f} ms{error}")
+    
+    with st.expander("Prometheus exposition"):
+        st.code(metrics.render_prometheus(), language="text")
+
+def render_page():
+    with metrics.request_context(), metrics.timer("render_page", page=st.session_state.active_page):
+        if st.session_state.user_id:
+            # User is logged in
+            render_sidebar()
+        
+            if check_session_validity():
+                # Show appropriate page
+                if st.session_state.active_page == "dashboard":
+                    render_dashboard()
+                elif st.session_state.active_page == "upload":
+                    render_upload_page()
+                elif st.session_state.active_page == "document":
+                    render_document_page()
+                elif st.session_state.active_page == "flashcards":
+                    render_flashcards_page()
+                elif st.session_state.active_page == "review":
+                    render_review_page()
+                elif st.session_state.active_page == "quizzes":
+                    render_quizzes_page()
+                elif st.session_state.active_page == "take_quiz":
+                    render_take_quiz_page()
+                elif st.session_state.active_page == "progress":
+                    render_progress_page()
+                elif st.session_state.active_page == "search":
+                    render_search_page()
+                elif st.session_state.active_page == "admin":
+                    render_admin_page()
+            else:
+                render_login_page()
+        else:
+            # User is not logged in
+            render_login_page()
+
 def main():
     # Initialize database
-    init_db()
+    try:
+        init_db()
+    except Exception as e:
+        st.error(f"Database initialization failed: {str(e)}")
+        st.stop()
+    
+    start_job_workers()
+    start_metrics_server()
     
     # Initialize session state
     init_session_state()
     
-    # Page routing
-    if st.session_state.user_id:
-        # User is logged in
-        render_sidebar()
-        
-        if check_session_validity():
-            # Show appropriate page
-            if st.session_state.active_page == "dashboard":
-                render_dashboard()
-            elif st.session_state.active_page == "upload":
-                render_upload_page()
-            elif st.session_state.active_page == "document":
-                render_document_page()
-            elif st.session_state.active_page == "flashcards":
-                render_flashcards_page()
-            elif st.session_state.active_page == "quizzes":
-                render_quizzes_page()
-            elif st.session_state.active_page == "take_quiz":
-                render_take_quiz_page()
-            elif st.session_state.active_page == "progress":
-                render_progress_page()
-        else:
-            render_login_page()
-    else:
-        # User is not logged in
-        render_login_page()
+    # Page routing; each rerun is traced as one request
+    try:
+        render_page()
+    except JobPending:
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
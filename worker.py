@@ -0,0 +1,53 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import threading
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Importing the handlers registers them with the job queue.
+from flashcard_core import handlers  # noqa: F401
+from flashcard_core import db, metrics
+from flashcard_core.bootstrap import bootstrap
+from flashcard_core.jobs import run_worker
+
+
+def worker_process(index: int, metrics_port: int):
+    if metrics_port:
+        metrics.start_http_server(metrics_port + index)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run_worker(worker_id=f"{os.uname().nodename}:{os.getpid()}:{index}", stop=stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the background job worker pool")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="serve /metrics from worker i on port METRICS_PORT + i (0 disables)")
+    args = parser.parse_args()
+
+    bootstrap()
+    # Forked workers must open their own SQLite connections, not share the
+    # parent's bootstrap connection.
+    db.close_all()
+
+    processes = [multiprocessing.Process(target=worker_process, args=(i, args.metrics_port), name=f"job-worker-{i}")
+                 for i in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()